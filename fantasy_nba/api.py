@@ -0,0 +1,146 @@
+from typing import NamedTuple
+
+import pandas as pd
+
+from .cache import DiskCache, variability_cache
+from .configs import (
+    PLAYOFF_WEEKS,
+    PLAYOFF_WEIGHT,
+    FantasyConfig,
+    base_fantasy_config,
+)
+from .schedule import apply_schedule, games_matrix, read_schedule
+from .settings import settings
+from .valuation import (
+    normalise_projections,
+    player_contributions,
+    player_values,
+    positional_values,
+    punt_scores,
+    punt_totals,
+    salaries,
+)
+from .variability import (
+    VARIABILITY_COLUMNS,
+    apply_week_variability,
+    estimate_week_variability,
+)
+
+
+class Valuation(NamedTuple):
+    normalised_data: pd.DataFrame
+    normalisation_lambdas: pd.DataFrame
+    positional_value_data: pd.DataFrame
+    bl_positional_value_data: pd.DataFrame
+    value_data: pd.DataFrame
+    bl_value_data: pd.DataFrame
+    punt_data: pd.DataFrame
+    punt_value: pd.DataFrame
+    salary_data: pd.DataFrame
+    contribution_data: pd.DataFrame
+
+
+def load_week_variability() -> pd.DataFrame:
+    # estimated from the GAME_LOG game log, empty keeps the configured
+    # week variability and schedule
+    if not settings.game_log:
+        return pd.DataFrame(columns=VARIABILITY_COLUMNS, dtype=float)
+
+    return estimate_week_variability(
+        f"{settings.data_dir}/{settings.game_log}",
+        list(base_fantasy_config.category_settings.keys()),
+        cache=variability_cache,
+    )
+
+
+def load_schedule() -> pd.DataFrame:
+    # teams x weeks games from the SCHEDULE file, empty keeps
+    # mean_schedule_week for every player
+    if not settings.schedule:
+        return games_matrix(pd.DataFrame(columns=["TEAM", "WEEK"]))
+
+    return games_matrix(
+        read_schedule(f"{settings.data_dir}/{settings.schedule}")
+    )
+
+
+def league_base_config(
+    week_variability: pd.DataFrame = None,
+    schedule_data: pd.DataFrame = None,
+    playoff_weeks: int = PLAYOFF_WEEKS,
+    playoff_weight: float = PLAYOFF_WEIGHT,
+) -> FantasyConfig:
+    # the league defaults with the GAME_LOG and SCHEDULE estimates, as the
+    # base_config asset builds them. Tables that are not passed are loaded.
+    if week_variability is None:
+        week_variability = load_week_variability()
+    if schedule_data is None:
+        schedule_data = load_schedule()
+
+    return apply_schedule(
+        apply_week_variability(base_fantasy_config, week_variability),
+        schedule_data,
+        playoff_weeks,
+        playoff_weight,
+    )
+
+
+def value_projections(
+    config: FantasyConfig,
+    projections: pd.DataFrame,
+    base_config: FantasyConfig = None,
+    normalised_data: pd.DataFrame = None,
+    normalisation_lambdas: pd.DataFrame = None,
+    cache: DiskCache = None,
+) -> Valuation:
+    # Runs the same steps as refresh_job in process, config holds the custom
+    # weights, slots and blacklist and base_config the league defaults,
+    # league_base_config() when not passed. config should be customised
+    # from the same base_config to match the assets. normalised_data and
+    # normalisation_lambdas can be passed back in when only weights, slots
+    # or the blacklist changed. cache keeps the normalisation on disk, None
+    # recomputes it every time.
+    if base_config is None:
+        base_config = league_base_config()
+
+    categories = list(config.category_settings.keys())
+    blacklist = list(config.blacklist.keys())
+
+    if normalised_data is None or normalisation_lambdas is None:
+        normalised_data, normalisation_lambdas = normalise_projections(
+            projections, config, cache=cache
+        )
+
+    positional_value_data, bl_positional_value_data = positional_values(
+        normalised_data, normalisation_lambdas, base_config, blacklist=blacklist
+    )
+
+    value_data, bl_value_data = player_values(
+        positional_value_data,
+        bl_positional_value_data,
+        projections,
+        config,
+        base_config,
+    )
+
+    punt_data = punt_totals(value_data, categories)
+    punt_value = punt_scores(punt_data, categories)
+
+    salary_data = salaries(bl_value_data, punt_value, config)
+
+    contribution_data = player_contributions(
+        bl_positional_value_data, projections, config, base_config
+    )
+
+    return Valuation(
+        normalised_data=normalised_data,
+        normalisation_lambdas=normalisation_lambdas,
+        positional_value_data=positional_value_data,
+        bl_positional_value_data=bl_positional_value_data,
+        value_data=value_data,
+        bl_value_data=bl_value_data,
+        punt_data=punt_data,
+        punt_value=punt_value,
+        salary_data=salary_data,
+        contribution_data=contribution_data,
+    )
@@ -1,42 +1,86 @@
+from itertools import product
+
 import pandas as pd
-from sklearn.preprocessing import PowerTransformer
-from numpy import sign
 from dagster import (
     asset,
+    multi_asset,
     AssetExecutionContext,
+    AssetIn,
+    AssetOut,
 )
 
 from .partitions import dataset_partition
-from .configs import FantasyConfig, base_fantasy_config, DagsterFantasyConfig
-from .transformations import (
-    calculate_percentage_value,
-    calculate_g_scores,
-    calculate_z_scores,
-    get_all_eligible_positions,
-    aggregate_player_value,
+from .configs import (
+    FantasyConfig,
+    base_fantasy_config,
+    DagsterFantasyConfig,
+    DagsterScenarioConfig,
+    customise_config,
+)
+from .valuation import (
+    normalise_projections,
+    player_contributions,
+    positional_values,
+    player_values,
+    salaries,
+    punt_totals,
+    punt_scores,
 )
+from .scenarios import evaluate_scenarios
+from .punts import player_punts
+from .cache import normalisation_cache, source_cache
+from .ingestion import load_source
+from .api import league_base_config, load_schedule, load_week_variability
+from .instrumentation import instrumented
+from .variability import apply_week_variability
 
 from .settings import settings
 
 CATEGORIES = list(base_fantasy_config.category_settings.keys())
-POSITIONS = list(base_fantasy_config.position_settings.keys())
 
 
 @asset
-def base_config(
-    context: AssetExecutionContext, config: DagsterFantasyConfig
-) -> FantasyConfig:
-    modified_config = base_fantasy_config.model_copy()
+@instrumented
+def week_variability(context: AssetExecutionContext) -> pd.DataFrame:
+    return load_week_variability()
 
-    for cat in CATEGORIES:
-        modified_config.category_settings[cat].weight = config.weights[cat]
 
-    for pos in POSITIONS:
-        modified_config.position_settings[pos].slots = config.slots[pos]
+@asset
+@instrumented
+def schedule_data(context: AssetExecutionContext) -> pd.DataFrame:
+    schedule_data = load_schedule()
+
+    context.add_output_metadata(
+        metadata={
+            "teams": len(schedule_data),
+            "weeks": len(schedule_data.columns),
+        }
+    )
+    return schedule_data
+
 
-    modified_config.blacklist = config.blacklist
-    modified_config.team_ft = config.team_ft
-    modified_config.team_fg = config.team_fg
+@asset(partitions_def=dataset_partition)
+@instrumented
+def base_config(
+    context: AssetExecutionContext,
+    config: DagsterFantasyConfig,
+    week_variability: pd.DataFrame,
+    schedule_data: pd.DataFrame,
+) -> FantasyConfig:
+    # the schedule's games per week replace the game log's estimate
+    modified_config = customise_config(
+        weights=config.weights,
+        slots=config.slots,
+        blacklist=config.blacklist,
+        team_ft=config.team_ft,
+        team_fg=config.team_fg,
+        base_config=league_base_config(
+            week_variability,
+            schedule_data,
+            config.playoff_weeks,
+            config.playoff_weight,
+        ),
+    )
 
     context.add_output_metadata(
         metadata={
@@ -48,334 +92,227 @@ def base_config(
 
 
 @asset(partitions_def=dataset_partition)
+@instrumented
 def load_data(
     context: AssetExecutionContext, base_config: FantasyConfig
 ) -> pd.DataFrame:
-    data = pd.read_csv(f"{settings.data_dir}/{context.partition_key}")
-    context.log.info(data)
+    source = context.partition_key.keys_by_dimension["source"]
+    data = load_source(f"{settings.data_dir}/{source}", cache=source_cache)
     return data
 
 
-@asset(partitions_def=dataset_partition)
-def normalised_data(
+@multi_asset(
+    outs={
+        "normalised_data": AssetOut(
+            description="One row per player with the weekly category "
+            "totals before the Yeo-Johnson transform and POS_MASK, a bitmask "
+            "of the positions the player is eligible at."
+        ),
+        "normalisation_lambdas": AssetOut(
+            description="The Yeo-Johnson lambda of every position and "
+            "category, applied to normalised_data by to_normalised_matrix."
+        ),
+    },
+    partitions_def=dataset_partition,
+)
+@instrumented
+def normalised_data_assets(
     context: AssetExecutionContext,
     base_config: FantasyConfig,
     load_data: pd.DataFrame,
-) -> pd.DataFrame:
+) -> tuple[pd.DataFrame, pd.DataFrame]:
 
-    load_data["FG%"] = calculate_percentage_value(
-        attempts=load_data["FGA"],
-        percent=load_data["FG%"],
-        team_percent=base_config.team_fg,
+    normalised_data, lambdas = normalise_projections(
+        load_data, base_config, cache=normalisation_cache
     )
 
-    load_data["FT%"] = calculate_percentage_value(
-        attempts=load_data["FTA"],
-        percent=load_data["FT%"],
-        team_percent=base_config.team_ft,
-    )
-
-    pt = PowerTransformer(method="yeo-johnson", standardize=True)
-    load_data = load_data[base_config.metadata_columns + CATEGORIES]
-
-    normal_data = load_data.copy()
-
-    normal_data["POS"] = (
-        normal_data["POS"]
-        .str.split("/")
-        .apply(lambda pos_list: get_all_eligible_positions(pos_list))
+    context.add_output_metadata(
+        metadata={"missing_pos": len(load_data) - len(normalised_data)},
+        output_name="normalised_data",
     )
+    return normalised_data, lambdas
 
-    exploded_positions = normal_data.explode("POS")
-
-    for pos in POSITIONS:
-        pos_data = exploded_positions.loc[
-            exploded_positions["POS"] == pos
-        ].copy()
-        for column in CATEGORIES:
-            pos_data[column] = pt.fit_transform(
-                pos_data[[column]] * base_config.mean_schedule_week
-            )
-
-        exploded_positions.loc[exploded_positions["POS"] == pos, CATEGORIES] = (
-            pos_data[CATEGORIES]
-        )
-        context.log.info(pos)
-        context.log.info(pos_data)
 
-    context.log.info(exploded_positions)
-    return exploded_positions
-
-
-@asset(
+@multi_asset(
+    outs={
+        "positional_value_data": AssetOut(),
+        "bl_positional_value_data": AssetOut(),
+    },
     partitions_def=dataset_partition,
 )
-def positional_value_data(
+@instrumented
+def positional_value_assets(
     context: AssetExecutionContext,
+    base_config: FantasyConfig,
+    week_variability: pd.DataFrame,
     normalised_data: pd.DataFrame,
-) -> pd.DataFrame:
-    exploded_positions = normalised_data.copy()
-
-    positional_data = (
-        exploded_positions.groupby("POS")
-        .apply(calculate_g_scores)
-        .reset_index(drop=True)
+    normalisation_lambdas: pd.DataFrame,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+
+    positional_data, bl_positional_data = positional_values(
+        normalised_data,
+        normalisation_lambdas,
+        apply_week_variability(base_fantasy_config, week_variability),
+        blacklist=list(base_config.blacklist.keys()),
     )
 
-    for position in POSITIONS:
-        pos_data = positional_data[positional_data["POS"] == position]
-
-        positions_total = pos_data[CATEGORIES].sum()
-
-        for category in CATEGORIES:
-            sub_pos = pos_data[category]
-
-            positions_left = sub_pos.sum()
-
-        positional_data.loc[positional_data["POS"] == position, category] = (
-            sign(sub_pos)
-            * (abs(sub_pos) * (positions_total[category] / positions_left))
-        )
-
-    positional_data["VALUE"] = positional_data[CATEGORIES].sum(axis=1)
-
-    context.log.info(positional_data)
-    return positional_data
+    return positional_data, bl_positional_data
 
 
-@asset(
+@multi_asset(
+    outs={
+        "value_data": AssetOut(),
+        "bl_value_data": AssetOut(),
+    },
+    ins={"load_data": AssetIn(metadata={"columns": ["PLAYER", "POS"]})},
     partitions_def=dataset_partition,
 )
-def bl_positional_value_data(
+@instrumented
+def value_assets(
     context: AssetExecutionContext,
     base_config: FantasyConfig,
-    normalised_data: pd.DataFrame,
-) -> pd.DataFrame:
-
-    blacklist = list(base_config.blacklist.keys())
-
-    bl_data = normalised_data.copy()[~normalised_data["PLAYER"].isin(blacklist)]
-
-    exploded_positions = bl_data.copy()
-
-    positional_data = (
-        exploded_positions.groupby("POS")
-        .apply(calculate_g_scores)
-        .reset_index(drop=True)
+    load_data: pd.DataFrame,
+    positional_value_data: pd.DataFrame,
+    bl_positional_value_data: pd.DataFrame,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+
+    agg_slot_data, bl_agg_slot_data = player_values(
+        positional_value_data,
+        bl_positional_value_data,
+        load_data,
+        base_config,
+        base_fantasy_config,
     )
 
-    for position in POSITIONS:
-        pos_data = positional_data[positional_data["POS"] == position]
-
-        positions_total = pos_data[CATEGORIES].sum()
-
-        for category in CATEGORIES:
-            sub_pos = pos_data[category]
-
-            positions_left = sub_pos.sum()
-
-        positional_data.loc[positional_data["POS"] == position, category] = (
-            sign(sub_pos)
-            * (abs(sub_pos) * (positions_total[category] / positions_left))
-        )
-
-    positional_data["VALUE"] = positional_data[CATEGORIES].sum(axis=1)
-
-    context.log.info(positional_data)
-    return positional_data
+    return agg_slot_data, bl_agg_slot_data
 
 
 @asset(partitions_def=dataset_partition)
-def value_data(
+@instrumented
+def salary_data(
     context: AssetExecutionContext,
-    load_data: pd.DataFrame,
-    positional_value_data: pd.DataFrame,
+    base_config: FantasyConfig,
+    bl_value_data: pd.DataFrame,
+    punt_value: pd.DataFrame,
 ) -> pd.DataFrame:
+    salary_data = salaries(bl_value_data, punt_value, base_config)
 
-    values_data = positional_value_data.copy()
-
-    values_data[CATEGORIES] = values_data[CATEGORIES].apply(
-        lambda x: x * base_fantasy_config.category_settings[x.name].weight
-    )
-
-    percent_gp = values_data["GP"] / 82
-    values_data["VALUE"] = values_data[CATEGORIES].sum(axis=1)
-    values_data["VALUE"] = sign(values_data["VALUE"]) * (
-        abs(values_data["VALUE"]) * percent_gp
-    )
-
-    slot_value_data = values_data.copy()
-
-    slot_value_data["SLOTS"] = slot_value_data["POS"].map(
-        lambda pos: base_fantasy_config.position_settings[pos].slots
-    )
-
-    agg_slot_data = (
-        slot_value_data.groupby("PLAYER")
-        .apply(aggregate_player_value)
-        .reset_index(drop=True)
-    )
-
-    agg_slot_data = pd.merge(
-        agg_slot_data, load_data[["PLAYER", "POS"]], on="PLAYER"
-    )
-
-    context.log.info(agg_slot_data)
-    return agg_slot_data
+    return salary_data
 
 
-@asset(partitions_def=dataset_partition)
-def bl_value_data(
+@asset(
+    ins={"load_data": AssetIn(metadata={"columns": ["PLAYER", "POS"]})},
+    partitions_def=dataset_partition,
+)
+@instrumented
+def contribution_data(
     context: AssetExecutionContext,
     base_config: FantasyConfig,
     load_data: pd.DataFrame,
     bl_positional_value_data: pd.DataFrame,
 ) -> pd.DataFrame:
 
-    values_data = bl_positional_value_data.copy()
-
-    values_data[CATEGORIES] = values_data[CATEGORIES].apply(
-        lambda x: x * base_config.category_settings[x.name].weight
-    )
-
-    percent_gp = values_data["GP"] / 82
-    values_data["VALUE"] = values_data[CATEGORIES].sum(axis=1)
-    values_data["VALUE"] = sign(values_data["VALUE"]) * (
-        abs(values_data["VALUE"]) * percent_gp
-    )
-
-    slot_value_data = values_data.copy()
-
-    slot_value_data["SLOTS"] = slot_value_data["POS"].map(
-        lambda pos: (
-            base_config.position_settings[pos].slots
-            * (
-                (base_fantasy_config.team_size - base_fantasy_config.bench_size)
-                / base_fantasy_config.team_size
-            )
-            + base_fantasy_config.position_settings[pos].slots
-            * (base_fantasy_config.bench_size / base_fantasy_config.team_size)
-        )
-    )
-
-    agg_slot_data = (
-        slot_value_data.groupby("PLAYER")
-        .apply(aggregate_player_value)
-        .reset_index(drop=True)
-    )
-
-    agg_slot_data = pd.merge(
-        agg_slot_data, load_data[["PLAYER", "POS"]], on="PLAYER"
+    contribution_data = player_contributions(
+        bl_positional_value_data,
+        load_data,
+        base_config,
+        base_fantasy_config,
     )
 
-    context.log.info(agg_slot_data)
-    return agg_slot_data
+    return contribution_data
 
 
 @asset(partitions_def=dataset_partition)
-def salary_data(
+@instrumented
+def punt_data(
     context: AssetExecutionContext,
     base_config: FantasyConfig,
-    bl_value_data: pd.DataFrame,
-    punt_value: pd.DataFrame,
+    value_data: pd.DataFrame,
 ) -> pd.DataFrame:
-    salary_data = bl_value_data.copy()
 
-    c_scored_cats = [
-        cat for cat in CATEGORIES if base_config.category_settings[cat].weight
-    ]
+    punt_data = punt_totals(value_data, CATEGORIES)
 
-    def peak_value(row):
-        player_cats = c_scored_cats.copy()
-
-        while len(player_cats) > max(6, len(c_scored_cats) - 1):
-
-            punt_name = (
-                punt_value[punt_value["PLAYER"] == row["PLAYER"]][player_cats]
-                .idxmax(axis=1)
-                .values[0]
-            )
-
-            min_category_value = row[punt_name]
-
-            p_value = (row["VALUE"] - min_category_value) * (
-                len(player_cats) / len(c_scored_cats)
-            )
-            row["VALUE"] = max(row["VALUE"], p_value)
-            player_cats.remove(punt_name)
-
-        return row
-
-    salary_data = salary_data.apply(peak_value, axis=1)
-
-    spent = list(base_config.blacklist.values())
-    top_values = salary_data.sort_values(by="VALUE", ascending=False).head(
-        max(base_config.total_drafted_players, 20)
-    )
+    return punt_data
 
-    salary_data["SALARY"] = (
-        top_values["VALUE"]
-        * ((base_config.fantasy_teams * base_config.salary_cap) - sum(spent))
-        / top_values["VALUE"].sum()
-    )
 
-    salary_data["SALARY"] = salary_data["SALARY"].where(
-        salary_data["SALARY"] > 1, 1
-    )
+@asset(partitions_def=dataset_partition)
+@instrumented
+def punt_value(
+    context: AssetExecutionContext,
+    base_config: FantasyConfig,
+    punt_data: pd.DataFrame,
+) -> pd.DataFrame:
 
-    salary_data = salary_data[
-        base_config.metadata_columns
-        + list(base_config.category_settings.keys())
-        + ["VALUE", "SALARY"]
-    ]
-    salary_data.sort_values(by="VALUE", ascending=False, inplace=True)
+    punt_value = punt_scores(punt_data, CATEGORIES)
 
-    context.log.info(salary_data)
-    return salary_data
+    return punt_value
 
 
 @asset(partitions_def=dataset_partition)
-def punt_data(
+@instrumented
+def punt_combination_data(
     context: AssetExecutionContext,
     base_config: FantasyConfig,
     value_data: pd.DataFrame,
 ) -> pd.DataFrame:
 
-    punt_data = value_data.copy()
+    punt_combination_data = player_punts(value_data, base_config)
 
-    for category in CATEGORIES:
-        punt_data[category] = (
-            value_data[CATEGORIES].sum(axis=1) - value_data[category]
-        )
-
-    return punt_data
+    return punt_combination_data
 
 
 @asset(partitions_def=dataset_partition)
-def punt_value(
+@instrumented
+def scenario_data(
     context: AssetExecutionContext,
+    config: DagsterScenarioConfig,
     base_config: FantasyConfig,
-    punt_data: pd.DataFrame,
+    week_variability: pd.DataFrame,
+    normalised_data: pd.DataFrame,
+    normalisation_lambdas: pd.DataFrame,
 ) -> pd.DataFrame:
 
-    punt_value = punt_data.copy()
+    scenarios = list(product(config.weights, config.slots))
+
+    scenario_data = evaluate_scenarios(
+        [
+            customise_config(
+                weights=weights,
+                slots=slots,
+                blacklist=base_config.blacklist,
+                team_ft=base_config.team_ft,
+                team_fg=base_config.team_fg,
+                base_config=base_config,
+            )
+            for weights, slots in scenarios
+        ],
+        normalised_data,
+        normalisation_lambdas,
+        base_config=apply_week_variability(
+            base_fantasy_config, week_variability
+        ),
+    )
 
-    punt_value[CATEGORIES + ["VALUE"]] = punt_data[
-        CATEGORIES + ["VALUE"]
-    ].apply(calculate_z_scores)
+    scenario_data["WEIGHTS"], scenario_data["SLOTS"] = divmod(
+        scenario_data["SCENARIO"], len(config.slots)
+    )
 
-    return punt_value
+    context.add_output_metadata(metadata={"scenarios": len(scenarios)})
+    return scenario_data
 
 
 all_assets = [
+    week_variability,
+    schedule_data,
     base_config,
     load_data,
-    normalised_data,
-    positional_value_data,
-    value_data,
+    normalised_data_assets,
+    positional_value_assets,
+    value_assets,
     salary_data,
+    contribution_data,
     punt_data,
     punt_value,
-    bl_positional_value_data,
-    bl_value_data,
+    punt_combination_data,
+    scenario_data,
 ]
@@ -0,0 +1,146 @@
+import hashlib
+import os
+import pickle
+import tempfile
+from collections import OrderedDict
+from typing import Any, Callable, List
+
+from .settings import settings
+
+
+class DiskCache:
+    # Content addressed pickle store, entries are named by the hash of
+    # their inputs and the least recently used ones are evicted once the
+    # directory grows past max_bytes. Safe to share between processes.
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(*parts: bytes) -> str:
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(hashlib.sha256(part).digest())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def get(self, key: str) -> Any:
+        # Anything that cannot be read back is a miss, an entry evicted by
+        # another process, a truncated file or a pickle of classes that have
+        # changed since, which can raise nearly any exception.
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                value = pickle.load(file)
+        except Exception:
+            return None
+
+        # the modification time doubles as the last use for eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def put(self, key: str, value: Any):
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        with tempfile.NamedTemporaryFile(
+            dir=self.cache_dir, suffix=".tmp", delete=False
+        ) as file:
+            try:
+                pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+            except BaseException:
+                file.close()
+                os.remove(file.name)
+                raise
+        os.replace(file.name, self._path(key))
+
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".pkl"):
+                # other processes evict from the same directory
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+class TableCache:
+    # Decoded tables keyed by path and the file's mtime/size, so a file is
+    # only read again once it has actually been rewritten. Tables are
+    # shared between reruns, sessions and runs, and must not be modified.
+    def __init__(self, max_entries: int = 8):
+        self.max_entries = max_entries
+        self.tables = OrderedDict()
+
+    @staticmethod
+    def version(path: str) -> tuple[int, int]:
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def load(
+        self,
+        path: str,
+        reader: Callable[..., Any],
+        columns: List[str] = None,
+    ) -> Any:
+        # with columns only those are read, reader(path, columns), and kept
+        # under their own entry unless the whole table is cached already
+        version = self.version(path)
+
+        whole = self.tables.get(path)
+        if columns is not None and whole is not None and whole[0] == version:
+            self._touch(path)
+            return whole[1][list(columns)]
+
+        key = path if columns is None else (path, tuple(columns))
+        cached = self.tables.get(key)
+        if cached is None or cached[0] != version:
+            table = reader(path) if columns is None else reader(path, columns)
+            cached = (version, table)
+            self.tables[key] = cached
+
+        self._touch(key)
+        return cached[1]
+
+    def store(self, path: str, table: Any):
+        # a table that was just written to path, so the next load skips
+        # reading it back
+        self.tables[path] = (self.version(path), table)
+        self._touch(path)
+
+    def _touch(self, key: Any):
+        self.tables.move_to_end(key)
+        while len(self.tables) > self.max_entries:
+            self.tables.popitem(last=False)
+
+
+normalisation_cache = DiskCache(
+    os.path.join(settings.cache_dir, "normalised_data"), settings.cache_size
+)
+
+source_cache = DiskCache(
+    os.path.join(settings.cache_dir, "load_data"), settings.cache_size
+)
+
+variability_cache = DiskCache(
+    os.path.join(settings.cache_dir, "week_variability"), settings.cache_size
+)
@@ -2,10 +2,17 @@ from dagster import Config
 from pydantic import BaseModel
 from typing import List, Literal, Set
 
+PLAYOFF_WEEKS = 3
+PLAYOFF_WEIGHT = 1
+
 
 class CategoryConfig(BaseModel):
     weight: float = 1
     week_variability: float = 1
+    # how the league scores the category in a matchup, 1 if more wins it,
+    # -1 if less does and 0 if it isn't one of the league's categories.
+    # Weights only change the valuation.
+    direction: Literal[-1, 0, 1] = 1
 
 
 class PositionConfig(BaseModel):
@@ -19,6 +26,9 @@ class FantasyConfig(BaseModel):
     fantasy_teams: int
     salary_cap: int
     mean_schedule_week: float
+    # weighted games per week by team from the schedule, players of other
+    # teams fall back to mean_schedule_week
+    team_schedule_week: dict[str, float] = {}
     position_settings: dict[str, PositionConfig]
     category_settings: dict[str, CategoryConfig]
     metadata_columns: List[str]
@@ -46,6 +56,16 @@ class DagsterFantasyConfig(Config):
     blacklist: dict[str, int]
     team_ft: float
     team_fg: float
+    # the last playoff_weeks weeks of the schedule count playoff_weight times
+    playoff_weeks: int = PLAYOFF_WEEKS
+    playoff_weight: float = PLAYOFF_WEIGHT
+
+
+class DagsterScenarioConfig(Config):
+    # every combination of weights and slots is evaluated as one scenario,
+    # entries only need the categories/positions they override
+    weights: List[dict[str, float]] = [{}]
+    slots: List[dict[str, int]] = [{}]
 
 
 POSITION_ELIGIBILITY_MAP = {
@@ -96,6 +116,19 @@ CATEGORY_WEEK_VARIABILITY = {
     "TO": 0.6,
 }
 
+CATEGORY_DIRECTIONS = {
+    "PTS": 1,
+    "REB": 1,
+    "AST": 1,
+    "STL": 1,
+    "BLK": 1,
+    "3PM": 1,
+    "FG%": 1,
+    "FT%": 1,
+    # "TO": -1,
+    "TO": 0,
+}
+
 METADATA_COLUMNS = ["PLAYER", "TEAM", "POS", "GP"]
 
 base_fantasy_config = FantasyConfig(
@@ -114,8 +147,33 @@ base_fantasy_config = FantasyConfig(
         category: CategoryConfig(
             weight=CATEGORY_WEIGHTS[category],
             week_variability=CATEGORY_WEEK_VARIABILITY[category],
+            direction=CATEGORY_DIRECTIONS[category],
         )
         for category in CATEGORY_WEIGHTS.keys()
     },
     blacklist={},
 )
+
+
+def customise_config(
+    weights: dict[str, float],
+    slots: dict[str, int],
+    blacklist: dict[str, int],
+    team_ft: float = 0,
+    team_fg: float = 0,
+    base_config: FantasyConfig = base_fantasy_config,
+) -> FantasyConfig:
+    # deep copy so the module level defaults are never modified
+    modified_config = base_config.model_copy(deep=True)
+
+    for cat, weight in weights.items():
+        modified_config.category_settings[cat].weight = weight
+
+    for pos, slot in slots.items():
+        modified_config.position_settings[pos].slots = slot
+
+    modified_config.blacklist = dict(blacklist)
+    modified_config.team_ft = team_ft
+    modified_config.team_fg = team_fg
+
+    return modified_config
@@ -1,11 +1,13 @@
 from dagster import Definitions
 
 from .assets import all_assets
+from .io_manager import ArrowIOManager
 from .jobs import all_jobs
-from .sensor import config_sensor
+from .sensor import config_sensor, reference_sensor
 
 defs = Definitions(
     assets=all_assets,
     jobs=all_jobs,
-    sensors=[config_sensor]
+    sensors=[config_sensor, reference_sensor],
+    resources={"io_manager": ArrowIOManager()},
 )
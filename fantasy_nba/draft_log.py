@@ -0,0 +1,114 @@
+import json
+import os
+import pickle
+import tempfile
+import time
+from typing import Any, Iterator, List
+
+from .settings import settings
+
+SNAPSHOT_PREFIX = "snapshot-"
+
+
+class DraftLog:
+    # Append only log of a draft's applied events, one JSON line each with
+    # its sequence number and time, fsync'd before the events are
+    # acknowledged. Pickled snapshots of the derived state are written
+    # every snapshot_interval events so a restart only replays the tail.
+
+    def __init__(
+        self,
+        directory: str,
+        snapshot_interval: int = None,
+        keep_snapshots: int = 3,
+    ):
+        self.directory = directory
+        self.path = os.path.join(directory, "events.jsonl")
+        self.snapshot_interval = (
+            snapshot_interval or settings.draft_snapshot_interval
+        )
+        self.keep_snapshots = keep_snapshots
+
+        os.makedirs(directory, exist_ok=True)
+        self._truncate_torn_write()
+        self.file = open(self.path, "a")
+
+        snapshots = self._snapshot_sequences()
+        self.snapshot_sequence = snapshots[-1] if snapshots else 0
+
+    def _truncate_torn_write(self):
+        # a crash part way through an append leaves a line without its
+        # newline, drop it so the next append starts on a fresh line
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, "rb+") as file:
+            data = file.read()
+            if data and not data.endswith(b"\n"):
+                file.truncate(data.rfind(b"\n") + 1)
+
+    def append(self, events: List[dict]):
+        if not events:
+            return
+
+        now = time.time()
+        for event in events:
+            self.file.write(json.dumps({"time": now, **event}) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def events(self, after: int = 0, until: int = None) -> Iterator[dict]:
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path) as file:
+            for line in file:
+                event = json.loads(line)
+                if event["sequence"] <= after:
+                    continue
+                if until is not None and event["sequence"] > until:
+                    break
+                yield event
+
+    def snapshot_due(self, sequence: int) -> bool:
+        return sequence - self.snapshot_sequence >= self.snapshot_interval
+
+    def write_snapshot(self, sequence: int, snapshot: Any):
+        with tempfile.NamedTemporaryFile(
+            dir=self.directory, suffix=".tmp", delete=False
+        ) as file:
+            pickle.dump(snapshot, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(file.name, self._snapshot_path(sequence))
+        self.snapshot_sequence = sequence
+
+        for old in self._snapshot_sequences()[: -self.keep_snapshots]:
+            os.remove(self._snapshot_path(old))
+
+    def snapshots(self, until: int = None) -> Iterator[tuple[int, Any]]:
+        # Newest first, snapshots that cannot be read are skipped and the
+        # events replayed instead. Unpickling a snapshot of classes that
+        # have changed since can raise nearly any exception.
+        for sequence in reversed(self._snapshot_sequences()):
+            if until is not None and sequence > until:
+                continue
+            try:
+                with open(self._snapshot_path(sequence), "rb") as file:
+                    snapshot = pickle.load(file)
+            except Exception:
+                continue
+            yield sequence, snapshot
+
+    def _snapshot_path(self, sequence: int) -> str:
+        return os.path.join(
+            self.directory, f"{SNAPSHOT_PREFIX}{sequence:08d}.pkl"
+        )
+
+    def _snapshot_sequences(self) -> List[int]:
+        return sorted(
+            int(name.removeprefix(SNAPSHOT_PREFIX).removesuffix(".pkl"))
+            for name in os.listdir(self.directory)
+            if name.startswith(SNAPSHOT_PREFIX) and name.endswith(".pkl")
+        )
+
+    def close(self):
+        self.file.close()
@@ -0,0 +1,437 @@
+import asyncio
+import copy
+import json
+import os
+from typing import List
+
+import pandas as pd
+
+from .api import league_base_config, value_projections
+from .cache import DiskCache, normalisation_cache
+from .configs import (
+    CATEGORY_WEIGHTS,
+    POSITION_SLOTS,
+    FantasyConfig,
+    customise_config,
+)
+from .draft_log import DraftLog
+from .incremental import IncrementalValuation
+from .ingestion import load_source
+from .sensor import write_config
+from .settings import settings
+
+EVENT_TYPES = ["bid", "restore", "settings"]
+
+KEEPALIVE_SECONDS = 15
+
+STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    500: "Internal Server Error",
+}
+
+PAGE = b"""<!doctype html>
+<meta charset="utf-8">
+<title>Draft</title>
+<style>td, th { padding: 0 0.5em; text-align: right }</style>
+<p id="state"></p>
+<table id="salaries"></table>
+<script>
+const events = new EventSource("/events");
+events.onmessage = (message) => {
+  const update = JSON.parse(message.data);
+  document.getElementById("state").textContent =
+    `event ${update.state.sequence}, ${Object.keys(update.state.blacklist)
+      .length} players gone`;
+  const rows = update.salaries;
+  const columns = rows.length ? Object.keys(rows[0]) : [];
+  const cell = (value) =>
+    typeof value === "number" ? value.toFixed(2) : value ?? "";
+  document.getElementById("salaries").innerHTML =
+    "<tr>" + columns.map((c) => `<th>${c}</th>`).join("") + "</tr>" +
+    rows.map((row) => "<tr>" + columns.map((c) => `<td>${cell(row[c])}</td>`)
+      .join("") + "</tr>").join("");
+};
+</script>
+"""
+
+
+class DraftState:
+    # The live draft for one league: weights, slots, the blacklist with
+    # prices and each team's roster. Bids and restores are delta updates on
+    # an IncrementalValuation, weight or slot changes revalue from scratch
+    # reusing the normalised data.
+
+    def __init__(
+        self,
+        projections: pd.DataFrame,
+        weights: dict[str, float] = None,
+        slots: dict[str, int] = None,
+        base_config: FantasyConfig = None,
+    ):
+        self.set_projections(projections)
+        # the game log and schedule estimates, as the base_config asset
+        # applies them
+        self.base_config = base_config or league_base_config()
+        self.weights = dict(weights or CATEGORY_WEIGHTS)
+        self.slots = dict(slots or POSITION_SLOTS)
+        self.blacklist = {}
+        self.rosters = {}
+        self.sequence = 0
+        # logged events that no longer apply to the projections
+        self.skipped = []
+        self.normalised_data = None
+        self.normalisation_lambdas = None
+        self.revalue()
+
+    def set_projections(self, projections: pd.DataFrame):
+        self.projections = projections
+        self.players = set(projections["PLAYER"])
+
+    def __getstate__(self) -> dict:
+        # snapshots leave the projections out, they are loaded from source
+        return {
+            name: value
+            for name, value in self.__dict__.items()
+            if name not in ["projections", "players"]
+        }
+
+    def config_inputs(self) -> dict:
+        return {
+            "weights": self.weights,
+            "slots": self.slots,
+            "blacklist": self.blacklist,
+        }
+
+    def revalue(self, weights: dict = None, slots: dict = None):
+        # values new weights or slots before replacing anything, so a
+        # failed valuation leaves the draft as it was
+        inputs = {
+            **self.config_inputs(),
+            "weights": self.weights if weights is None else weights,
+            "slots": self.slots if slots is None else slots,
+        }
+        config = customise_config(**inputs, base_config=self.base_config)
+        valuation = value_projections(
+            config,
+            self.projections,
+            base_config=self.base_config,
+            normalised_data=self.normalised_data,
+            normalisation_lambdas=self.normalisation_lambdas,
+            cache=normalisation_cache,
+        )
+        incremental = IncrementalValuation(
+            valuation.normalised_data,
+            valuation.normalisation_lambdas,
+            self.projections,
+            valuation.punt_value,
+            config,
+            self.base_config,
+        )
+
+        self.weights, self.slots = inputs["weights"], inputs["slots"]
+        self.normalised_data = valuation.normalised_data
+        self.normalisation_lambdas = valuation.normalisation_lambdas
+        self.valuation = incremental
+
+    def apply(self, event: dict) -> int:
+        # applies one event and returns its sequence number, malformed
+        # events raise before anything is changed
+        kind = event.get("type")
+        if kind == "bid":
+            player, price = str(event["player"]), int(event.get("price", 1))
+            team = event.get("team")
+            if player not in self.players:
+                raise ValueError(f"unknown player {player}")
+            self._drop(player)
+            self.blacklist[player] = price
+            if team is not None:
+                self.rosters.setdefault(str(team), []).append(player)
+            self.valuation.remove(player, price)
+        elif kind == "restore":
+            player = str(event["player"])
+            self._drop(player)
+            self.blacklist.pop(player, None)
+            self.valuation.restore(player)
+        elif kind == "settings":
+            weights = {k: float(v) for k, v in event.get("weights", {}).items()}
+            slots = {k: int(v) for k, v in event.get("slots", {}).items()}
+            unknown = (set(weights) - set(self.weights)) | (
+                set(slots) - set(self.slots)
+            )
+            if unknown:
+                raise ValueError(f"unknown categories or slots {unknown}")
+            self.revalue({**self.weights, **weights}, {**self.slots, **slots})
+        else:
+            raise ValueError(f"unknown event type {kind}, use {EVENT_TYPES}")
+
+        self.sequence += 1
+        return self.sequence
+
+    def _drop(self, player: str):
+        for roster in self.rosters.values():
+            if player in roster:
+                roster.remove(player)
+
+    def snapshot(self) -> dict:
+        return {
+            "sequence": self.sequence,
+            **self.config_inputs(),
+            "rosters": self.rosters,
+            "skipped": self.skipped,
+        }
+
+    def update_message(self) -> bytes:
+        salaries = self.valuation.salary_data().to_json(orient="records")
+        return (
+            f'{{"state": {json.dumps(self.snapshot())}, '
+            f'"salaries": {salaries}}}'
+        ).encode()
+
+
+class DraftServer:
+    # Serves one DraftState over plain HTTP. Events are POSTed to /bid,
+    # /restore or /settings and applied in arrival order by a single task.
+    # Events that arrive while a valuation is running are applied together
+    # and followed by one update. Updates are pushed to every client on
+    # /events as server sent events. A slow client only ever gets the
+    # latest update.
+
+    def __init__(
+        self, state: DraftState, league: str = None, log: DraftLog = None
+    ):
+        self.state = state
+        self.league = league
+        self.log = log
+        self.events = asyncio.Queue()
+        self.clients = set()
+        self.latest = state.update_message()
+
+    async def process_events(self):
+        while True:
+            batch = [await self.events.get()]
+            while not self.events.empty():
+                batch.append(self.events.get_nowait())
+
+            try:
+                results, self.latest = await asyncio.to_thread(
+                    self.apply_events, [event for event, _ in batch]
+                )
+            except Exception as error:
+                # a failed log write or valuation fails this batch, the
+                # processor keeps serving later events. A failed log write
+                # rolls the batch back, see apply_events.
+                results = [error] * len(batch)
+            else:
+                for client in self.clients:
+                    if client.full():
+                        client.get_nowait()
+                    client.put_nowait(self.latest)
+
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def apply_events(self, events: List[dict]) -> tuple[list, bytes]:
+        # the state before the batch, put back if the log write fails so
+        # the draft never holds events that aren't durable
+        previous = copy.deepcopy(self.state) if self.log is not None else None
+        results = []
+        applied = []
+        for event in events:
+            try:
+                sequence = self.state.apply(event)
+            except (KeyError, TypeError, ValueError) as error:
+                results.append(ValueError(f"invalid event {event}: {error}"))
+                continue
+            results.append(sequence)
+            applied.append({"sequence": sequence, **event})
+
+        # events are durable before they are acknowledged
+        if self.log is not None:
+            try:
+                self.log.append(applied)
+            except BaseException:
+                previous.set_projections(self.state.projections)
+                self.state = previous
+                raise
+            if self.log.snapshot_due(self.state.sequence):
+                self.log.write_snapshot(
+                    self.state.sequence, draft_snapshot(self.state)
+                )
+
+        # keep the dagster materialisations in step with the draft
+        if self.league is not None:
+            write_config(
+                self.league,
+                {
+                    "source": settings.source,
+                    **self.state.config_inputs(),
+                    "team_ft": 0,
+                    "team_fg": 0,
+                },
+            )
+
+        return results, self.state.update_message()
+
+    async def submit(self, event: dict) -> int:
+        future = asyncio.get_running_loop().create_future()
+        await self.events.put((event, future))
+        return await future
+
+    async def handle(self, reader, writer):
+        try:
+            method, target, _ = (await reader.readline()).decode().split(" ")
+            path = target.partition("?")[0]
+
+            headers = {}
+            while (line := await reader.readline()) not in (b"\r\n", b"\n"):
+                if not line:
+                    return
+                name, _, value = line.decode().partition(":")
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(
+                int(headers.get("content-length", 0))
+            )
+
+            if method == "GET" and path == "/":
+                await respond(writer, 200, PAGE, "text/html")
+            elif method == "GET" and path == "/state":
+                await respond(writer, 200, self.latest)
+            elif method == "GET" and path == "/events":
+                await self.stream(writer)
+            elif method == "POST" and path[1:] in EVENT_TYPES:
+                try:
+                    event = {**json.loads(body or b"{}"), "type": path[1:]}
+                    sequence = await self.submit(event)
+                except (TypeError, ValueError) as error:
+                    message = json.dumps({"error": str(error)})
+                    await respond(writer, 400, message.encode())
+                except Exception as error:
+                    message = json.dumps({"error": str(error)})
+                    await respond(writer, 500, message.encode())
+                else:
+                    message = json.dumps({"sequence": sequence})
+                    await respond(writer, 200, message.encode())
+            else:
+                await respond(writer, 404, b'{"error": "not found"}')
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def stream(self, writer):
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream\r\n"
+            b"Cache-Control: no-cache\r\n"
+            b"Access-Control-Allow-Origin: *\r\n\r\n"
+        )
+        client = asyncio.Queue(maxsize=1)
+        client.put_nowait(self.latest)
+        self.clients.add(client)
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(
+                        client.get(), KEEPALIVE_SECONDS
+                    )
+                    writer.write(b"data: " + message + b"\n\n")
+                except asyncio.TimeoutError:
+                    # comments keep proxies open and find closed clients
+                    writer.write(b": keepalive\n\n")
+                await writer.drain()
+        finally:
+            self.clients.discard(client)
+
+    async def serve(self, host: str, port: int):
+        processor = asyncio.create_task(self.process_events())
+        server = await asyncio.start_server(self.handle, host, port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            processor.cancel()
+
+
+async def respond(
+    writer, status: int, body: bytes, content_type: str = "application/json"
+):
+    writer.write(
+        f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Access-Control-Allow-Origin: *\r\n"
+        "Connection: close\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+
+
+def projection_key(projections: pd.DataFrame) -> str:
+    return DiskCache.key(
+        pd.util.hash_pandas_object(projections).to_numpy().tobytes()
+    )
+
+
+def config_key(config: FantasyConfig) -> str:
+    return DiskCache.key(config.model_dump_json().encode())
+
+
+def draft_snapshot(state: DraftState) -> dict:
+    return {
+        "projection_key": projection_key(state.projections),
+        "config_key": config_key(state.base_config),
+        "state": state,
+    }
+
+
+def restore_draft(
+    log: DraftLog, projections: pd.DataFrame, until: int = None
+) -> DraftState:
+    # The newest snapshot taken on the same projections and league config
+    # plus the events logged after it, or every event from the start. A new
+    # game log or schedule changes the config and the normalisation, so
+    # older snapshots are passed over. until stops at that sequence number
+    # to reproduce any earlier point in the draft.
+    base_config = league_base_config()
+    keys = (projection_key(projections), config_key(base_config))
+    state = next(
+        (
+            snapshot["state"]
+            for _, snapshot in log.snapshots(until)
+            if (snapshot["projection_key"], snapshot.get("config_key")) == keys
+        ),
+        None,
+    )
+    if state is None:
+        state = DraftState(projections, base_config=base_config)
+    else:
+        state.set_projections(projections)
+
+    # Events are replayed leniently. Projections edited since the events
+    # were logged can drop a player that was bid on, those events are kept
+    # in state.skipped rather than stopping the restore.
+    for event in log.events(state.sequence, until):
+        try:
+            state.apply(event)
+        except (KeyError, TypeError, ValueError):
+            state.skipped.append(event)
+        state.sequence = event["sequence"]
+
+    return state
+
+
+def main():
+    projections = load_source(f"{settings.data_dir}/{settings.source}")
+    log = DraftLog(os.path.join(settings.draft_dir, settings.league))
+    server = DraftServer(restore_draft(log, projections), settings.league, log)
+    asyncio.run(server.serve(settings.draft_host, settings.draft_port))
+
+
+if __name__ == "__main__":
+    main()
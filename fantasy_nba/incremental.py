@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+
+from .configs import FantasyConfig, base_fantasy_config
+from .valuation import (
+    aggregate_player_values,
+    blended_slot_vector,
+    category_vector,
+    from_positional_matrix,
+    salaries,
+    slot_vector,
+    to_normalised_matrix,
+    to_player_frame,
+)
+
+
+class IncrementalValuation:
+    # Keeps running per position/category counts, sums and sums of squares
+    # for the players still available so that buying a player only costs a
+    # delta update instead of a full refresh_job run. Outputs match the
+    # bl_positional_value_data, bl_value_data and salary_data assets.
+
+    def __init__(
+        self,
+        normalised_data: pd.DataFrame,
+        lambdas: pd.DataFrame,
+        load_data: pd.DataFrame,
+        punt_value: pd.DataFrame,
+        config: FantasyConfig,
+        base_config: FantasyConfig = base_fantasy_config,
+    ):
+        self.config = config.model_copy(deep=True)
+        self.config.blacklist = {}
+        self.categories = list(config.category_settings.keys())
+
+        self.matrix = to_normalised_matrix(
+            normalised_data,
+            lambdas,
+            list(config.position_settings.keys()),
+            self.categories,
+            config.metadata_columns,
+        )
+        self.player_ids = {
+            player: i for i, player in enumerate(self.matrix.players["PLAYER"])
+        }
+        self.available = np.ones(len(self.player_ids), dtype=bool)
+
+        self.week_variability = category_vector(base_config, "week_variability")
+        self.weights = category_vector(config, "weight")
+        self.slots = blended_slot_vector(config, base_config)
+        self.total_slots = slot_vector(base_config)
+
+        self.player_positions = load_data[["PLAYER", "POS"]]
+        self.punt_value = punt_value
+
+        # sums are kept around the starting mean so removing players does
+        # not lose precision to cancellation in the sum of squares
+        values = self.matrix.values
+        self._valid = self.matrix.eligible[:, :, None] & ~np.isnan(values)
+        self._count = self._valid.sum(axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            shift = np.where(self._valid, values, 0).sum(axis=0) / self._count
+        self._centered = np.where(self._valid, values - np.nan_to_num(shift), 0)
+        self._sum = self._centered.sum(axis=0)
+        self._sum_squares = (self._centered**2).sum(axis=0)
+
+        for player, price in config.blacklist.items():
+            self.remove(player, price)
+
+    def remove(self, player: str, price: int = 0):
+        self.config.blacklist[player] = price
+
+        player_id = self.player_ids.get(player)
+        if player_id is None or not self.available[player_id]:
+            return
+
+        self.available[player_id] = False
+        self._update(player_id, -1)
+
+    def restore(self, player: str):
+        self.config.blacklist.pop(player, None)
+
+        player_id = self.player_ids.get(player)
+        if player_id is None or self.available[player_id]:
+            return
+
+        self.available[player_id] = True
+        self._update(player_id, 1)
+
+    def _update(self, player_id: int, direction: int):
+        centered = self._centered[player_id]
+        self._count += direction * self._valid[player_id]
+        self._sum += direction * centered
+        self._sum_squares += direction * centered**2
+
+    def g_scores(self) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = self._sum / self._count
+            std = np.sqrt(
+                (self._sum_squares - self._sum * mean) / (self._count - 1)
+            )
+            z_scores = (self._centered - mean) / std
+
+        valid = self._valid & self.available[:, None, None]
+        return np.where(valid, z_scores, np.nan) * self.week_variability
+
+    def positional_value_data(self) -> pd.DataFrame:
+        g_scores = self.g_scores()
+        matrix = self.matrix._replace(
+            eligible=self.matrix.eligible & self.available[:, None]
+        )
+
+        return from_positional_matrix(
+            matrix,
+            g_scores,
+            self.config.metadata_columns + self.categories + ["VALUE"],
+            value=np.nansum(g_scores, axis=2),
+        )
+
+    def value_data(self) -> pd.DataFrame:
+        available = self.available
+        category_values, value = aggregate_player_values(
+            self.g_scores()[available],
+            self.matrix.eligible[available],
+            self.matrix.players["GP"].to_numpy(dtype=float)[available],
+            self.weights,
+            self.slots,
+            self.total_slots,
+        )
+
+        return to_player_frame(
+            self.matrix.players[available],
+            category_values,
+            value,
+            self.categories,
+            self.player_positions,
+        )
+
+    def salary_data(self) -> pd.DataFrame:
+        return salaries(self.value_data(), self.punt_value, self.config)
@@ -0,0 +1,179 @@
+import os
+from typing import Iterator, List
+
+import numpy as np
+import pandas as pd
+
+from .cache import DiskCache
+from .settings import settings
+
+COUNTING_STATS = [
+    "FGM",
+    "FGA",
+    "FTM",
+    "FTA",
+    "3PM",
+    "PTS",
+    "REB",
+    "AST",
+    "STL",
+    "BLK",
+    "TO",
+]
+TEXT_COLUMNS = ["PLAYER", "POS", "TEAM"]
+
+# per player projections, one row per player, in the data/bob.csv layout
+PROJECTION_COLUMNS = [
+    "PLAYER",
+    "POS",
+    "TEAM",
+    "GP",
+    "FG%",
+    "FGM",
+    "FGA",
+    "FT%",
+    "FTM",
+    "FTA",
+    "3PM",
+    "PTS",
+    "REB",
+    "AST",
+    "STL",
+    "BLK",
+    "TO",
+]
+PROJECTION_OPTIONAL = ["RANK", "ADP", "MPG", "TOTAL"]
+
+# one row per player per game
+GAME_LOG_COLUMNS = TEXT_COLUMNS + COUNTING_STATS
+GAME_LOG_OPTIONAL = ["GAME_DATE", "MIN"]
+
+
+def read_header(path: str) -> List[str]:
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def validate_columns(path: str, columns: List[str], required: List[str]):
+    missing = [column for column in required if column not in columns]
+    if missing:
+        raise ValueError(f"{path} is missing columns {missing}")
+
+
+def is_game_log(path: str) -> bool:
+    # projections carry games played, game logs have a row per game instead
+    return "GP" not in read_header(path)
+
+
+def validate_source(path: str):
+    # raises ValueError unless load_source can read path
+    header = read_header(path)
+    required = PROJECTION_COLUMNS if "GP" in header else GAME_LOG_COLUMNS
+    validate_columns(path, header, required)
+
+
+def read_chunks(
+    path: str,
+    required: List[str],
+    optional: List[str],
+    chunksize: int = None,
+) -> Iterator[pd.DataFrame]:
+    # Validated chunks holding only the known columns, numbers that do not
+    # parse become NaN and rows without a player are dropped.
+    header = read_header(path)
+    validate_columns(path, header, required)
+    columns = required + [column for column in optional if column in header]
+
+    for chunk in pd.read_csv(
+        path,
+        usecols=columns,
+        dtype={column: str for column in TEXT_COLUMNS},
+        chunksize=chunksize or settings.ingest_chunksize,
+    ):
+        for column in columns:
+            if column not in TEXT_COLUMNS and column != "GAME_DATE":
+                chunk[column] = pd.to_numeric(chunk[column], errors="coerce")
+
+        yield chunk.dropna(subset=["PLAYER"])[
+            [column for column in header if column in columns]
+        ]
+
+
+def read_projections(path: str, chunksize: int = None) -> pd.DataFrame:
+    # dumps with several rows per player keep the last one, so memory is
+    # bounded by the number of players rather than rows
+    projections = pd.DataFrame()
+    for chunk in read_chunks(
+        path, PROJECTION_COLUMNS, PROJECTION_OPTIONAL, chunksize
+    ):
+        projections = pd.concat([projections, chunk]).drop_duplicates(
+            "PLAYER", keep="last"
+        )
+
+    return projections.reset_index(drop=True)
+
+
+def aggregate_game_logs(path: str, chunksize: int = None) -> pd.DataFrame:
+    # Season lines in the projection layout, built in a single pass that
+    # keeps running totals per player. TEAM and POS are the last seen.
+    totals = None
+    latest = None
+    for chunk in read_chunks(
+        path, GAME_LOG_COLUMNS, GAME_LOG_OPTIONAL, chunksize
+    ):
+        chunk["GP"] = 1
+        counted = [c for c in ["GP", "MIN"] + COUNTING_STATS if c in chunk]
+        players = chunk.groupby("PLAYER", sort=False)
+
+        chunk_totals = players[counted].sum(min_count=1)
+        chunk_latest = players[["POS", "TEAM"]].last()
+
+        if totals is None:
+            totals, latest = chunk_totals, chunk_latest
+            continue
+
+        totals = totals.add(chunk_totals, fill_value=0)
+        latest = chunk_latest.combine_first(latest)
+
+    if totals is None:
+        return pd.DataFrame(columns=PROJECTION_COLUMNS)
+
+    games = totals["GP"]
+    season = latest.reindex(totals.index)
+    season["GP"] = games.astype(int)
+    if "MIN" in totals:
+        season["MPG"] = totals["MIN"] / games
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        season["FG%"] = totals["FGM"] / totals["FGA"]
+        season["FT%"] = totals["FTM"] / totals["FTA"]
+    for stat in COUNTING_STATS:
+        season[stat] = totals[stat] / games
+
+    season = season.rename_axis("PLAYER").reset_index()
+    columns = PROJECTION_COLUMNS[:4] + ["MPG"] + PROJECTION_COLUMNS[4:]
+    return season[[column for column in columns if column in season]]
+
+
+def load_source(
+    path: str, chunksize: int = None, cache: DiskCache = None
+) -> pd.DataFrame:
+    # the parsed source only depends on the file, so every league reading
+    # it shares one cache entry until the file is rewritten
+    if cache is not None:
+        stat = os.stat(path)
+        key = DiskCache.key(
+            os.path.abspath(path).encode(),
+            f"{stat.st_mtime_ns}:{stat.st_size}".encode(),
+        )
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    if is_game_log(path):
+        source = aggregate_game_logs(path, chunksize)
+    else:
+        source = read_projections(path, chunksize)
+
+    if cache is not None:
+        cache.put(key, source)
+    return source
@@ -0,0 +1,132 @@
+import functools
+import os
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+import pandas as pd
+from dagster import AssetExecutionContext, MetadataValue
+
+from .settings import settings
+
+
+def current_rss() -> int:
+    # Resident set size right now, None where /proc is missing. ru_maxrss
+    # is the peak over the life of the process, which a long lived run
+    # worker never comes back down from.
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def reset_peak_rss() -> bool:
+    # Writing 5 to clear_refs resets VmHWM, the peak resident set size, to
+    # the current one, so peak_rss covers a single step. Linux only.
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+    except OSError:
+        return False
+
+    return True
+
+
+def peak_rss() -> int:
+    # VmHWM, or ru_maxrss where /proc is missing, the peak over the life of
+    # the process in kilobytes or, on macOS, bytes. None on Windows.
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def frame_metadata(df: pd.DataFrame) -> dict:
+    # shallow memory usage, deep sizing of string columns costs as much as
+    # some of the assets themselves
+    return {
+        "rows": len(df),
+        "columns": len(df.columns),
+        "bytes": int(df.memory_usage(deep=False).sum()),
+    }
+
+
+def instrumented(fn):
+    # Records run time, current and peak memory and the size of DataFrame
+    # inputs and outputs as output metadata. Whole frames are only logged
+    # with DEBUG set and allocations only traced with TRACE_MEMORY set.
+    @functools.wraps(fn)
+    def wrapper(context: AssetExecutionContext, *args, **kwargs):
+        inputs = {
+            name: frame_metadata(value)
+            for name, value in kwargs.items()
+            if isinstance(value, pd.DataFrame)
+        }
+
+        # a trace someone else started is left running
+        trace = settings.trace_memory and not tracemalloc.is_tracing()
+        rss_before = current_rss()
+        step_peak = reset_peak_rss()
+        if trace:
+            tracemalloc.start()
+        try:
+            wall_start = time.perf_counter()
+            cpu_start = time.process_time()
+
+            result = fn(context, *args, **kwargs)
+
+            metadata = {
+                "wall_seconds": time.perf_counter() - wall_start,
+                "cpu_seconds": time.process_time() - cpu_start,
+                "input_rows": sum(i["rows"] for i in inputs.values()),
+                "input_bytes": sum(i["bytes"] for i in inputs.values()),
+                "inputs": MetadataValue.json(inputs),
+            }
+            if trace:
+                _, peak = tracemalloc.get_traced_memory()
+                metadata["traced_peak_mib"] = peak / 1024**2
+        finally:
+            if trace:
+                tracemalloc.stop()
+
+        rss_after = current_rss()
+        if rss_after is not None:
+            metadata["rss_mib"] = rss_after / 1024**2
+            metadata["rss_growth_mib"] = (rss_after - rss_before) / 1024**2
+        # the step's own peak, or the process's where it can't be reset
+        peak = peak_rss()
+        if peak is not None:
+            name = "peak_rss_mib" if step_peak else "process_peak_rss_mib"
+            metadata[name] = peak / 1024**2
+
+        outputs = result if isinstance(result, tuple) else (result,)
+        for output_def, output in zip(context.op_def.output_defs, outputs):
+            output_metadata = dict(metadata)
+            if isinstance(output, pd.DataFrame):
+                output_metadata.update(frame_metadata(output))
+                if settings.debug:
+                    context.log.debug(f"{output_def.name}\n{output}")
+
+            context.add_output_metadata(
+                metadata=output_metadata, output_name=output_def.name
+            )
+
+        return result
+
+    return wrapper
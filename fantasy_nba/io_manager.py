@@ -0,0 +1,123 @@
+import os
+import pickle
+import tempfile
+from typing import Any, List
+
+import pandas as pd
+import pyarrow as pa
+from dagster import ConfigurableIOManager, InputContext, OutputContext
+
+from .cache import TableCache
+from .settings import settings
+
+TABLE_SUFFIX = ".arrow"
+OBJECT_SUFFIX = ".pkl"
+
+# tables written or read by this process, a long lived run worker then
+# hands the frames from one step or run to the next without a read
+table_cache = TableCache(settings.table_cache_entries)
+
+
+def table_path(
+    asset: str, partition: str = None, base_dir: str = settings.output_dir
+) -> str:
+    name = partition if partition is not None else asset
+    return os.path.join(base_dir, asset, name)
+
+
+def write_table(data: pd.DataFrame, path: str):
+    # uncompressed Arrow IPC so readers can memory map the file and only
+    # touch the columns they select
+    table = pa.Table.from_pandas(data, preserve_index=True)
+
+    # a temp file of its own, runs of different leagues write the
+    # unpartitioned assets at the same time
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    os.close(fd)
+    try:
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def read_table(
+    asset: str,
+    partition: str = None,
+    columns: List[str] = None,
+    base_dir: str = settings.output_dir,
+) -> pd.DataFrame:
+    path = table_path(asset, partition, base_dir) + TABLE_SUFFIX
+    return read_table_file(path, columns)
+
+
+def read_table_file(path: str, columns: List[str] = None) -> pd.DataFrame:
+    with pa.memory_map(path, "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+
+    if columns is not None:
+        # keep the stored index columns so the frame round trips
+        index_columns = [
+            column
+            for column in table.schema.pandas_metadata["index_columns"]
+            if isinstance(column, str)
+        ]
+        table = table.select(list(columns) + index_columns)
+
+    return table.to_pandas()
+
+
+class ArrowIOManager(ConfigurableIOManager):
+    # DataFrames are stored as Arrow IPC files, anything else (base_config)
+    # falls back to pickle. Inputs can ask for a subset of columns with
+    # AssetIn(metadata={"columns": [...]}).
+    base_dir: str = settings.output_dir
+
+    def _path(self, context) -> str:
+        asset = "/".join(context.asset_key.path)
+        partition = (
+            context.asset_partition_key
+            if context.has_asset_partitions
+            else None
+        )
+        return table_path(asset, partition, self.base_dir)
+
+    def handle_output(self, context: OutputContext, obj: Any):
+        path = self._path(context)
+
+        if isinstance(obj, pd.DataFrame):
+            write_table(obj, path + TABLE_SUFFIX)
+            table_cache.store(path + TABLE_SUFFIX, obj)
+            context.add_output_metadata(
+                {"path": path + TABLE_SUFFIX, "rows": len(obj)}
+            )
+            return
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(path), suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "wb") as file:
+                pickle.dump(obj, file)
+            os.replace(tmp_path, path + OBJECT_SUFFIX)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def load_input(self, context: InputContext) -> Any:
+        path = self._path(context)
+
+        if os.path.exists(path + TABLE_SUFFIX):
+            # each step gets its own copy, the cached frame is shared
+            columns = (context.definition_metadata or {}).get("columns")
+            return table_cache.load(
+                path + TABLE_SUFFIX, read_table_file, columns
+            ).copy()
+
+        with open(path + OBJECT_SUFFIX, "rb") as file:
+            return pickle.load(file)
@@ -1,35 +1,52 @@
-from dagster import define_asset_job
+from dagster import define_asset_job, in_process_executor
 from .assets import (
-    positional_value_data,
-    value_data,
+    positional_value_assets,
+    value_assets,
     salary_data,
+    contribution_data,
     base_config,
     punt_value,
     punt_data,
-    bl_positional_value_data,
-    bl_value_data,
-    normalised_data,
+    punt_combination_data,
+    normalised_data_assets,
+    scenario_data,
+    week_variability,
+    schedule_data,
 )
 from .partitions import dataset_partition
 
-
 all_assets_job = define_asset_job(
     name="all_assets_job", partitions_def=dataset_partition
 )
 refresh_job = define_asset_job(
     name="refresh_job",
     selection=[
-        positional_value_data,
-        value_data,
-        normalised_data,
+        positional_value_assets,
+        value_assets,
+        normalised_data_assets,
         salary_data,
+        contribution_data,
         base_config,
         punt_value,
         punt_data,
-        bl_positional_value_data,
-        bl_value_data,
+        punt_combination_data,
     ],
     partitions_def=dataset_partition,
+    # the steps are small, a process per step costs more than they do
+    executor_def=in_process_executor,
+)
+
+# inputs shared by every league, rebuilt by reference_sensor when the
+# GAME_LOG or SCHEDULE files change instead of by every league's refresh
+reference_assets = [week_variability, schedule_data]
+reference_job = define_asset_job(
+    name="reference_job", selection=reference_assets
+)
+
+scenario_job = define_asset_job(
+    name="scenario_job",
+    selection=[scenario_data],
+    partitions_def=dataset_partition,
 )
 
-all_jobs = [all_assets_job, refresh_job]
+all_jobs = [all_assets_job, refresh_job, reference_job, scenario_job]
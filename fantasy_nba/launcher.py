@@ -0,0 +1,149 @@
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+from dagster import DagsterEventType, DagsterInstance, Field
+
+# dagster has no public api for run launchers, these internals are why
+# setup.py pins the dagster version
+from dagster._core.events import EngineEventData
+from dagster._core.instance import InstanceRef
+from dagster._core.launcher import (
+    CheckRunHealthResult,
+    LaunchRunContext,
+    RunLauncher,
+    WorkerStatus,
+)
+from dagster._grpc.impl import core_execute_run
+from dagster._serdes import ConfigurableClass, ConfigurableClassData
+from dagster._utils.hosted_user_process import recon_job_from_origin
+
+# the worker's instance, opened by its first run
+worker_instance = None
+
+
+def warm_up():
+    # pay for the imports once per worker instead of once per run
+    import fantasy_nba.definitions  # noqa: F401
+
+
+def execute_in_worker(instance_ref: InstanceRef, run_id: str) -> bool:
+    global worker_instance
+    if worker_instance is None:
+        worker_instance = DagsterInstance.from_ref(instance_ref)
+
+    run = worker_instance.get_run_by_id(run_id)
+    worker_instance.report_engine_event(
+        f"Started run in warm worker (pid: {os.getpid()}).",
+        run,
+        EngineEventData.in_process(os.getpid()),
+    )
+
+    succeeded = True
+    for event in core_execute_run(
+        recon_job_from_origin(run.job_code_origin),
+        run,
+        worker_instance,
+        inject_env_vars=True,
+    ):
+        if event.event_type == DagsterEventType.RUN_FAILURE:
+            succeeded = False
+
+    return succeeded
+
+
+class WarmRunLauncher(RunLauncher, ConfigurableClass):
+    # Runs execute in a pool of long lived worker processes owned by the
+    # process that launches them, the daemon under dagster dev. Workers
+    # import the code location once and keep the io manager's table cache
+    # between runs, so a refresh only pays for its own steps. Runs use the
+    # launching process's python environment.
+
+    def __init__(
+        self, workers: int = 1, inst_data: ConfigurableClassData = None
+    ):
+        self.workers = workers
+        self._inst_data = inst_data
+        self._pool = None
+        self._futures: dict[str, Future] = {}
+        super().__init__()
+
+    @property
+    def inst_data(self) -> ConfigurableClassData:
+        return self._inst_data
+
+    @classmethod
+    def config_type(cls) -> dict:
+        return {"workers": Field(int, is_required=False, default_value=1)}
+
+    @classmethod
+    def from_config_value(
+        cls, inst_data: ConfigurableClassData, config_value: dict
+    ) -> "WarmRunLauncher":
+        return cls(inst_data=inst_data, **config_value)
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        # spawned rather than forked, the launching process runs threads
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=warm_up,
+            )
+        return self._pool
+
+    def launch_run(self, context: LaunchRunContext):
+        run = context.dagster_run
+        try:
+            future = self.pool.submit(
+                execute_in_worker, self._instance.get_ref(), run.run_id
+            )
+        except BrokenProcessPool:
+            # a worker died and took the pool with it, start a fresh one
+            self._pool = None
+            future = self.pool.submit(
+                execute_in_worker, self._instance.get_ref(), run.run_id
+            )
+
+        self._futures[run.run_id] = future
+        future.add_done_callback(partial(self._finished, run.run_id))
+
+    def _finished(self, run_id: str, future: Future):
+        # Only running runs are tracked. A worker that died cannot report
+        # its own failure, so the run is failed here.
+        self._futures.pop(run_id, None)
+        if future.cancelled() or future.exception() is None:
+            return
+
+        run = self._instance.get_run_by_id(run_id)
+        if run is not None and not run.is_finished:
+            self._instance.report_run_failed(
+                run, f"Run worker failed: {future.exception()!r}"
+            )
+
+    def terminate(self, run_id: str) -> bool:
+        # workers are shared, only runs still waiting for one can be stopped
+        future = self._futures.get(run_id)
+        if future is None or not future.cancel():
+            return False
+
+        run = self._instance.get_run_by_id(run_id)
+        self._instance.report_run_canceled(run)
+        return True
+
+    @property
+    def supports_check_run_worker_health(self) -> bool:
+        return True
+
+    def check_run_worker_health(self, run) -> CheckRunHealthResult:
+        # finished runs are dropped, their outcome is in the run storage
+        if run.run_id in self._futures:
+            return CheckRunHealthResult(WorkerStatus.RUNNING)
+        return CheckRunHealthResult(WorkerStatus.NOT_FOUND)
+
+    def dispose(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
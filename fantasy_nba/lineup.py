@@ -0,0 +1,74 @@
+from typing import List
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import linear_sum_assignment
+
+BENCH = "BENCH"
+
+
+def slot_columns(slots: dict[str, int], bench_size: int) -> List[str]:
+    starters = [pos for pos, count in slots.items() for _ in range(count)]
+    return starters + [BENCH] * bench_size
+
+
+def assign_rosters(
+    positional_value: pd.DataFrame,
+    rosters: List[List[str]],
+    slots: dict[str, int],
+    bench_size: int,
+) -> List[dict[str, str]]:
+    # Maximum value assignment of players to lineup slots, solved for every
+    # roster at once as a single assignment problem over a block diagonal
+    # player x slot matrix. Starting slots are filled before the bench and
+    # players that fit nowhere are left out of the result.
+    columns = slot_columns(slots, bench_size)
+    players = [player for roster in rosters for player in roster]
+    roster_of_player = np.repeat(
+        np.arange(len(rosters)), list(map(len, rosters))
+    )
+
+    position_values = (
+        positional_value.drop_duplicates(subset=["PLAYER", "POS"])
+        .pivot(index="PLAYER", columns="POS", values="VALUE")
+        .reindex(index=players, columns=[pos for pos in slots])
+        .to_numpy(dtype=float)
+    )
+
+    starter = np.array([column != BENCH for column in columns])
+    column_positions = [
+        list(slots).index(column) if column != BENCH else 0
+        for column in columns
+    ]
+    values = np.where(starter, position_values[:, column_positions], 0)
+
+    # a starter is always worth more than any spread of values, an
+    # ineligible or cross roster pairing is worth less than anything else
+    starter_bonus = 2 * np.nansum(np.abs(position_values)) + 1
+    infeasible = -starter_bonus * (len(players) + 1)
+    values = np.where(starter, values + starter_bonus, values)
+    values = np.where(np.isnan(values), infeasible, values)
+
+    score = np.full((len(players), len(columns) * len(rosters)), infeasible)
+    roster_of_column = np.repeat(np.arange(len(rosters)), len(columns))
+    same_roster = roster_of_player[:, None] == roster_of_column[None, :]
+    score[same_roster] = np.tile(values, len(rosters))[same_roster]
+
+    assignments = [{} for _ in rosters]
+    for row, col in zip(*linear_sum_assignment(score, maximize=True)):
+        if score[row, col] > infeasible:
+            roster = roster_of_player[row]
+            assignments[roster][players[row]] = columns[col % len(columns)]
+
+    return assignments
+
+
+def open_slots(
+    assignment: dict[str, str], slots: dict[str, int]
+) -> dict[str, int]:
+    position_slots = slots.copy()
+    for slot in assignment.values():
+        if slot != BENCH:
+            position_slots[slot] -= 1
+
+    return position_slots
@@ -0,0 +1,203 @@
+from itertools import combinations
+from typing import List, NamedTuple
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr
+
+from .configs import FantasyConfig, base_fantasy_config
+from .schedule import player_schedule_weeks
+from .variability import PERCENTAGE_STATS
+
+
+class TeamWeeks(NamedTuple):
+    # teams x categories mean and standard deviation of a week's result,
+    # percentage categories as the team's percentage
+    mean: np.ndarray
+    std: np.ndarray
+    categories: List[str]
+
+
+def weekly_impact(
+    projections: pd.DataFrame, config: FantasyConfig
+) -> tuple[pd.DataFrame, pd.DataFrame, dict[str, float]]:
+    # per player weekly totals for every category, percentage categories as
+    # makes above the pool's rate, with the weekly attempts and the rates.
+    # Players get their own team's games per week when the schedule has it.
+    categories = list(config.category_settings.keys())
+    projections = projections.set_index("PLAYER")
+    week = projections.drop(columns="TEAM").mul(
+        player_schedule_weeks(projections["TEAM"], config), axis=0
+    )
+
+    impact = pd.DataFrame(index=week.index)
+    attempts = pd.DataFrame(index=week.index)
+    rates = {}
+    for category in categories:
+        if category in PERCENTAGE_STATS:
+            made, attempted = PERCENTAGE_STATS[category]
+            rates[category] = week[made].sum() / week[attempted].sum()
+            impact[category] = week[made] - rates[category] * week[attempted]
+            attempts[category] = week[attempted]
+        else:
+            impact[category] = week[category]
+
+    return impact, attempts, rates
+
+
+def team_weeks(
+    projections: pd.DataFrame,
+    rosters: List[List[str]],
+    config: FantasyConfig = base_fantasy_config,
+) -> TeamWeeks:
+    # Weekly means come from the per game projections, the week to week
+    # variance of a player is what week_variability leaves over the spread
+    # of weekly means across the pool, sigma_w^2 = sigma_b^2 (1/v^2 - 1).
+    categories = list(config.category_settings.keys())
+    columns = ["PLAYER", "TEAM"] + [
+        stat
+        for category in categories
+        for stat in PERCENTAGE_STATS.get(category, [category])
+    ]
+    impact, attempts, rates = weekly_impact(projections[columns], config)
+
+    week_variability = np.array(
+        [config.category_settings[c].week_variability for c in categories]
+    )
+    with np.errstate(divide="ignore"):
+        within = impact.var().to_numpy() * (1 / week_variability**2 - 1)
+
+    membership = np.zeros((len(rosters), len(impact)))
+    for team, roster in enumerate(rosters):
+        players = impact.index.get_indexer(roster)
+        membership[team, players[players >= 0]] = 1
+
+    mean = membership @ impact.fillna(0).to_numpy()
+    std = np.sqrt(membership.sum(axis=1, keepdims=True) * within)
+
+    # percentages are the pool rate plus makes above it per attempt
+    for category, rate in rates.items():
+        i = categories.index(category)
+        team_attempts = membership @ attempts[category].fillna(0).to_numpy()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean[:, i] = rate + mean[:, i] / team_attempts
+            std[:, i] = std[:, i] / team_attempts
+
+    return TeamWeeks(mean, std, categories)
+
+
+def round_robin(teams: int) -> np.ndarray:
+    return np.array(list(combinations(range(teams), 2)), dtype=int)
+
+
+def category_directions(config: FantasyConfig) -> np.ndarray:
+    # +1 where more wins the category, -1 where less does, 0 if unscored,
+    # as the league scores it whatever weights the valuation uses
+    return np.array(
+        [settings.direction for settings in config.category_settings.values()]
+    )
+
+
+def matchup_outcomes(category_wins: np.ndarray, scored: int) -> np.ndarray:
+    # pairs x 3 probabilities of winning, tying and losing the week from
+    # independent category win probabilities, a poisson binomial over the
+    # number of categories won
+    distribution = np.zeros((len(category_wins), scored + 1))
+    distribution[:, 0] = 1
+    for p in category_wins.T:
+        distribution[:, 1:] = (
+            distribution[:, 1:] * (1 - p[:, None])
+            + distribution[:, :-1] * p[:, None]
+        )
+        distribution[:, 0] *= 1 - p
+
+    wins = np.arange(scored + 1)
+    return np.stack(
+        [
+            distribution[:, wins * 2 > scored].sum(axis=1),
+            distribution[:, wins * 2 == scored].sum(axis=1),
+            distribution[:, wins * 2 < scored].sum(axis=1),
+        ],
+        axis=1,
+    )
+
+
+def normal_matchups(
+    weeks: TeamWeeks, pairs: np.ndarray, directions: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    scored = directions != 0
+    team, opponent = pairs.T
+
+    difference = (weeks.mean[team] - weeks.mean[opponent]) * directions
+    spread = np.sqrt(weeks.std[team] ** 2 + weeks.std[opponent] ** 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        category_wins = ndtr(difference / spread)
+    category_wins = np.where(np.isnan(category_wins), 0.5, category_wins)
+
+    outcomes = matchup_outcomes(category_wins[:, scored], scored.sum())
+    return category_wins, outcomes
+
+
+def sampled_matchups(
+    weeks: TeamWeeks,
+    pairs: np.ndarray,
+    directions: np.ndarray,
+    samples: int = 10_000,
+    seed: int = 0,
+) -> tuple[np.ndarray, np.ndarray]:
+    # every team's week is drawn once per sample and shared by all of its
+    # matchups, ties within a category count as half a win
+    rng = np.random.default_rng(seed)
+    scored = directions != 0
+    team, opponent = pairs.T
+
+    draws = weeks.mean + weeks.std * rng.standard_normal(
+        (samples,) + weeks.mean.shape
+    )
+    difference = (draws[:, team] - draws[:, opponent]) * directions
+    wins = (difference > 0) + 0.5 * (difference == 0)
+
+    category_wins = wins.mean(axis=0)
+
+    margin = np.sign(difference[..., scored]).sum(axis=-1)
+    outcomes = np.stack(
+        [(margin > 0).mean(axis=0), (margin == 0).mean(axis=0)], axis=1
+    )
+    outcomes = np.column_stack([outcomes, 1 - outcomes.sum(axis=1)])
+
+    return category_wins, outcomes
+
+
+def evaluate_matchups(
+    projections: pd.DataFrame,
+    rosters: List[List[str]],
+    config: FantasyConfig = base_fantasy_config,
+    pairs: np.ndarray = None,
+    method: str = "normal",
+    samples: int = 10_000,
+    seed: int = 0,
+) -> pd.DataFrame:
+    # Per category and overall win probabilities of TEAM against OPPONENT,
+    # for the given pairs of roster indices or every pair in the league.
+    # method is "normal" for the closed form or "monte_carlo".
+    weeks = team_weeks(projections, rosters, config)
+    directions = category_directions(config)
+    if pairs is None:
+        pairs = round_robin(len(rosters))
+    pairs = np.asarray(pairs, dtype=int).reshape(-1, 2)
+
+    if method == "normal":
+        category_wins, outcomes = normal_matchups(weeks, pairs, directions)
+    elif method == "monte_carlo":
+        category_wins, outcomes = sampled_matchups(
+            weeks, pairs, directions, samples, seed
+        )
+    else:
+        raise ValueError(f"unknown matchup method {method}")
+
+    matchups = pd.DataFrame(category_wins, columns=weeks.categories)
+    matchups[["WIN", "TIE", "LOSS"]] = outcomes
+    matchups.insert(0, "TEAM", pairs[:, 0])
+    matchups.insert(1, "OPPONENT", pairs[:, 1])
+
+    return matchups
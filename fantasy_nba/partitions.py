@@ -1,8 +1,10 @@
-import os
-from dagster import StaticPartitionsDefinition
+from dagster import DynamicPartitionsDefinition, MultiPartitionsDefinition
 
-from .settings import settings
+# both dimensions are registered by config_sensor as projection files and
+# league configs show up, so new ones never need a code location reload
+source_partition = DynamicPartitionsDefinition(name="projection_source")
+league_partition = DynamicPartitionsDefinition(name="league")
 
-dataset_partition = StaticPartitionsDefinition(
-    partition_keys=[filename for filename in os.listdir(settings.data_dir)]
+dataset_partition = MultiPartitionsDefinition(
+    {"source": source_partition, "league": league_partition}
 )
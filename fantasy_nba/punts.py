@@ -0,0 +1,130 @@
+from itertools import combinations
+from typing import List, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from .configs import FantasyConfig
+from .valuation import punt_penalty
+
+
+class PuntCombinations(NamedTuple):
+    # every subset of the scored categories up to max_punts, as bitmasks
+    # over categories, with the penalty applied for punting that many.
+    # The empty subset comes first as NONE.
+    categories: List[str]
+    names: List[str]
+    masks: np.ndarray
+    sizes: np.ndarray
+    penalties: np.ndarray
+
+
+def punt_combinations(
+    config: FantasyConfig, max_punts: int = 3
+) -> PuntCombinations:
+    categories = [
+        category
+        for category, settings in config.category_settings.items()
+        if settings.weight
+    ]
+    scored = len(categories)
+    max_punts = min(max_punts, scored - 1)
+
+    # the same penalty the punt peak in salary_data applies, so a punt is
+    # worth the same here and there
+    penalty = np.array(
+        [punt_penalty(scored, punts) for punts in range(max_punts + 1)]
+    )
+
+    combos = [
+        combo
+        for punts in range(max_punts + 1)
+        for combo in combinations(range(scored), punts)
+    ]
+    sizes = np.array([len(combo) for combo in combos], dtype=int)
+
+    return PuntCombinations(
+        categories=categories,
+        names=[
+            "+".join(categories[i] for i in combo) or "NONE" for combo in combos
+        ],
+        masks=np.array([sum(1 << i for i in combo) for combo in combos]),
+        sizes=sizes,
+        penalties=penalty[sizes],
+    )
+
+
+def mask_bits(masks: np.ndarray, count: int) -> np.ndarray:
+    # [combinations, categories] 1 where the category is in the mask
+    return (masks[:, None] >> np.arange(count)) & 1
+
+
+def combination_values(
+    category_values: np.ndarray,
+    value: np.ndarray,
+    combos: PuntCombinations,
+) -> np.ndarray:
+    # [..., combinations] value left after punting each combination, the
+    # scored categories on the last axis of category_values. The punted
+    # sums for every mask are a single product with the mask bits.
+    bits = mask_bits(combos.masks, len(combos.categories))
+    punted = np.nan_to_num(category_values) @ bits.T.astype(value.dtype)
+
+    values = np.subtract(value[..., None], punted, out=punted)
+    values *= combos.penalties.astype(value.dtype)
+    return values
+
+
+def player_punts(
+    value_data: pd.DataFrame,
+    config: FantasyConfig,
+    max_punts: int = 3,
+) -> pd.DataFrame:
+    # each player's VALUE with every combination of up to max_punts scored
+    # categories punted, one column per combination, NONE is VALUE itself
+    combos = punt_combinations(config, max_punts)
+
+    # float32 keeps the wide table at half the size of the value frames
+    values = combination_values(
+        value_data[combos.categories].to_numpy(dtype=np.float32),
+        value_data["VALUE"].to_numpy(dtype=np.float32),
+        combos,
+    )
+    punts = pd.DataFrame(values, columns=combos.names, copy=False)
+    punts.insert(0, "PLAYER", value_data["PLAYER"].to_numpy())
+
+    return punts
+
+
+def roster_punts(
+    value_data: pd.DataFrame,
+    rosters: List[List[str]],
+    config: FantasyConfig,
+    max_punts: int = 3,
+) -> pd.DataFrame:
+    # every combination for every roster's category and VALUE totals,
+    # one row per roster and combination with the best punt first
+    combos = punt_combinations(config, max_punts)
+
+    players = value_data.set_index("PLAYER")
+    membership = np.stack(
+        [players.index.isin(roster) for roster in rosters]
+    ).astype(float)
+    totals = membership @ np.nan_to_num(
+        players[combos.categories + ["VALUE"]].to_numpy(dtype=float)
+    )
+
+    values = combination_values(totals[:, :-1], totals[:, -1], combos)
+    teams, punts = np.indices(values.shape)
+    roster_data = pd.DataFrame(
+        {
+            "TEAM": teams.ravel(),
+            "PUNT": np.array(combos.names)[punts.ravel()],
+            "PUNTED": combos.sizes[punts.ravel()],
+            "VALUE": values.ravel(),
+        }
+    )
+
+    return roster_data.sort_values(
+        ["TEAM", "VALUE"], ascending=[True, False], kind="stable"
+    ).reset_index(drop=True)
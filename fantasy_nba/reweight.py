@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+
+from .api import Valuation
+from .configs import FantasyConfig
+from .valuation import GAMES_IN_SEASON, peak_values, punt_order
+
+
+class LinearValuation:
+    # VALUE and SALARY for any category weights from the contribution_data
+    # asset. VALUE is linear in the weights, GP / 82 * contributions @
+    # weights. The punt peak, which only uses the signs of the weights to
+    # pick the scored categories, and the top-N salary normalisation are
+    # applied exactly as salaries does, so the outputs match a full
+    # refresh with the same weights, slots and blacklist.
+
+    def __init__(
+        self,
+        contribution_data: pd.DataFrame,
+        punt_value: pd.DataFrame,
+        config: FantasyConfig,
+    ):
+        self.config = config
+        self.categories = list(config.category_settings.keys())
+        self.contribution_data = contribution_data
+
+        self.contributions = np.nan_to_num(
+            contribution_data[self.categories].to_numpy(dtype=float)
+        )
+        self.games_share = (
+            contribution_data["GP"].to_numpy(dtype=float) / GAMES_IN_SEASON
+        )
+
+        player_ids = pd.Index(punt_value["PLAYER"]).get_indexer(
+            contribution_data["PLAYER"]
+        )
+        self.punt_scores = punt_value[self.categories].to_numpy(dtype=float)[
+            player_ids
+        ]
+        # punt orders per set of scored categories
+        self.orders = {}
+
+        self.top_players = min(
+            max(config.total_drafted_players, 20), len(contribution_data)
+        )
+        self.money = config.fantasy_teams * config.salary_cap - sum(
+            config.blacklist.values()
+        )
+
+    def weight_vector(self, weights: dict[str, float]) -> np.ndarray:
+        # categories missing from weights keep the config's weight
+        return np.array(
+            [
+                weights.get(category, settings.weight)
+                for category, settings in self.config.category_settings.items()
+            ],
+            dtype=float,
+        )
+
+    def values(self, weights: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        category_values = self.contributions * weights
+        value = (self.contributions @ weights) * self.games_share
+        return category_values, value
+
+    def salaries(self, weights: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # peak VALUE and SALARY per player in contribution_data order
+        category_values, value = self.values(weights)
+
+        scored = weights != 0
+        key = scored.tobytes()
+        if key not in self.orders:
+            self.orders[key] = punt_order(self.punt_scores[:, scored])
+        peak = peak_values(category_values[:, scored], value, self.orders[key])
+
+        top = np.argpartition(
+            -np.nan_to_num(peak, nan=-np.inf), self.top_players - 1
+        )[: self.top_players]
+        salary = np.full(len(peak), np.nan)
+        salary[top] = peak[top] * self.money / peak[top].sum()
+
+        return peak, np.where(salary > 1, salary, 1)
+
+    def value_data(self, weights: dict[str, float]) -> pd.DataFrame:
+        # the bl_value_data asset for these weights
+        category_values, value = self.values(self.weight_vector(weights))
+
+        value_data = self.contribution_data.copy()
+        value_data[self.categories] = category_values
+        value_data["VALUE"] = value
+        return value_data
+
+    def salary_data(self, weights: dict[str, float]) -> pd.DataFrame:
+        # the salary_data asset for these weights
+        weight_vector = self.weight_vector(weights)
+        category_values, _ = self.values(weight_vector)
+        peak, salary = self.salaries(weight_vector)
+
+        salary_data = self.contribution_data[
+            self.config.metadata_columns
+        ].copy()
+        salary_data[self.categories] = category_values
+        salary_data["VALUE"] = peak
+        salary_data["SALARY"] = salary
+
+        return salary_data.iloc[np.argsort(-peak, kind="stable")]
+
+    def reweight(
+        self, valuation: Valuation, weights: dict[str, float]
+    ) -> Valuation:
+        # value_projections' outputs for these weights. value_data, the punt
+        # tables and everything before them are valued with the league
+        # defaults and carry over.
+        contribution_data = self.contribution_data.copy()
+        _, contribution_data["VALUE"] = self.values(self.weight_vector(weights))
+
+        return valuation._replace(
+            bl_value_data=self.value_data(weights),
+            salary_data=self.salary_data(weights),
+            contribution_data=contribution_data,
+        )
@@ -0,0 +1,173 @@
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from .configs import FantasyConfig, base_fantasy_config
+from .valuation import (
+    GAMES_IN_SEASON,
+    aggregate_player_values,
+    blended_slot_vector,
+    category_vector,
+    position_g_scores,
+    punt_penalty,
+    slot_vector,
+    to_normalised_matrix,
+)
+
+
+def batch_peak_values(
+    category_values: np.ndarray,
+    value: np.ndarray,
+    punt_scores: np.ndarray,
+    scored: np.ndarray,
+    min_categories: int = 6,
+) -> np.ndarray:
+    # scenarios x players version of valuation.peak_values, unscored
+    # categories sort to the end of each punt ordering as NaN
+    order = np.argsort(
+        -np.where(scored[:, None, :], punt_scores, np.nan),
+        axis=-1,
+        kind="stable",
+    )
+    scored_count = scored.sum(axis=1)
+    punts = scored_count - np.maximum(min_categories, scored_count - 1)
+
+    peak = value.copy()
+    punted_value = value.copy()
+    for punted in range(max(punts.max(initial=0), 0)):
+        punted_value = (
+            punted_value
+            - np.take_along_axis(
+                category_values, order[:, :, punted, None], axis=-1
+            )[..., 0]
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            punt_value = (
+                punted_value * punt_penalty(scored_count, punted + 1)[:, None]
+            )
+        update = (punted < punts)[:, None] & (punt_value > peak)
+        peak = np.where(update, punt_value, peak)
+
+    return peak
+
+
+def batch_salaries(
+    value: np.ndarray,
+    available: np.ndarray,
+    configs: List[FantasyConfig],
+) -> np.ndarray:
+    top_count = np.array(
+        [max(config.total_drafted_players, 20) for config in configs]
+    )
+    money = np.array(
+        [
+            config.fantasy_teams * config.salary_cap
+            - sum(config.blacklist.values())
+            for config in configs
+        ]
+    )
+
+    ranked = np.where(available & ~np.isnan(value), value, -np.inf)
+    order = np.argsort(-ranked, axis=1, kind="stable")
+    rank = np.empty_like(order)
+    np.put_along_axis(rank, order, np.arange(value.shape[1])[None, :], axis=1)
+
+    top = (rank < top_count[:, None]) & np.isfinite(ranked)
+    top_total = np.where(top, value, 0).sum(axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        salary = value * (money / top_total)[:, None]
+
+    return np.where(top & (salary > 1), salary, 1)
+
+
+def evaluate_scenarios(
+    configs: List[FantasyConfig],
+    normalised_data: pd.DataFrame,
+    lambdas: pd.DataFrame,
+    base_config: FantasyConfig = base_fantasy_config,
+) -> pd.DataFrame:
+    # Values every config against the same normalised data at once, as
+    # stacked scenarios x players x categories arrays. Matches VALUE and
+    # SALARY of salary_data for each config on its own.
+    positions = list(base_config.position_settings.keys())
+    categories = list(base_config.category_settings.keys())
+
+    matrix = to_normalised_matrix(
+        normalised_data,
+        lambdas,
+        positions,
+        categories,
+        base_config.metadata_columns,
+    )
+    week_variability = category_vector(base_config, "week_variability")
+    games_played = matrix.players["GP"].to_numpy(dtype=float)
+    slot_totals = np.where(matrix.eligible, slot_vector(base_config), 0).sum(
+        axis=1
+    )
+
+    # punt scores come from the full pool valued with the league defaults,
+    # the same as the punt_value asset, and are shared by every scenario
+    base_values, _ = aggregate_player_values(
+        position_g_scores(matrix.values, matrix.eligible, week_variability),
+        matrix.eligible,
+        games_played,
+        category_vector(base_config, "weight"),
+        slot_vector(base_config),
+        slot_vector(base_config),
+    )
+    punt_totals = base_values.sum(axis=1, keepdims=True) - base_values
+    punt_scores = (punt_totals - punt_totals.mean(axis=0)) / punt_totals.std(
+        axis=0, ddof=1
+    )
+
+    weights = np.stack([category_vector(c, "weight") for c in configs])
+    slots = np.stack([blended_slot_vector(c, base_config) for c in configs])
+
+    category_values = np.empty(
+        (len(configs), len(games_played), len(categories))
+    )
+    available = np.empty((len(configs), len(games_played)), dtype=bool)
+
+    # g-scores only change with the blacklist, so scenarios sharing one
+    # are scored together and weights/slots enter through a single einsum
+    blacklists = [tuple(sorted(config.blacklist)) for config in configs]
+    for blacklist in set(blacklists):
+        scenarios = np.array([b == blacklist for b in blacklists])
+        pool = ~matrix.players["PLAYER"].isin(blacklist).to_numpy()
+
+        g_scores = np.nan_to_num(
+            position_g_scores(
+                matrix.values,
+                matrix.eligible & pool[:, None],
+                week_variability,
+            )
+        )
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            category_values[scenarios] = (
+                np.einsum("npc,sp->snc", g_scores, slots[scenarios])
+                * weights[scenarios][:, None, :]
+                / slot_totals[:, None]
+            )
+        available[scenarios] = pool
+
+    value = category_values.sum(axis=-1) * (games_played / GAMES_IN_SEASON)
+
+    value = batch_peak_values(category_values, value, punt_scores, weights != 0)
+    salary = batch_salaries(value, available, configs)
+
+    scenario_idx, player_idx = np.nonzero(available)
+    scenario_data = pd.DataFrame(
+        {
+            "SCENARIO": scenario_idx,
+            "PLAYER": matrix.players["PLAYER"].to_numpy()[player_idx],
+            "VALUE": value[scenario_idx, player_idx],
+            "SALARY": salary[scenario_idx, player_idx],
+        }
+    )
+
+    return scenario_data.sort_values(
+        by=["SCENARIO", "VALUE"], ascending=[True, False], kind="stable"
+    ).reset_index(drop=True)
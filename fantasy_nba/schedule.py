@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+
+from .configs import FantasyConfig
+from .ingestion import read_header, validate_columns
+from .variability import week_numbers
+
+# one row per game with both teams, or one row per team and game
+GAME_COLUMNS = ["GAME_DATE", "HOME", "AWAY"]
+TEAM_GAME_COLUMNS = ["GAME_DATE", "TEAM"]
+
+
+def read_schedule(path: str) -> pd.DataFrame:
+    # TEAM and WEEK for every team and game, dates that do not parse are
+    # dropped
+    header = read_header(path)
+    if "TEAM" in header:
+        validate_columns(path, header, TEAM_GAME_COLUMNS)
+        games = pd.read_csv(path, usecols=TEAM_GAME_COLUMNS, dtype=str)
+    else:
+        validate_columns(path, header, GAME_COLUMNS)
+        games = pd.read_csv(path, usecols=GAME_COLUMNS, dtype=str).melt(
+            id_vars="GAME_DATE", value_name="TEAM"
+        )
+
+    games["WEEK"] = week_numbers(games["GAME_DATE"])
+    return games.dropna(subset=["TEAM", "WEEK"])[["TEAM", "WEEK"]]
+
+
+def games_matrix(schedule: pd.DataFrame) -> pd.DataFrame:
+    # Teams x weeks game counts with a column for every week from the first
+    # game to the last, named by its monday. Weeks without games, like the
+    # all star break, are kept as zeros.
+    if schedule.empty:
+        return pd.DataFrame(index=pd.Index([], name="TEAM"), dtype=int)
+
+    weeks = schedule["WEEK"].to_numpy(dtype=int)
+    first, last = weeks.min(), weeks.max()
+    teams, team_index = np.unique(
+        schedule["TEAM"].to_numpy(dtype=str), return_inverse=True
+    )
+
+    counts = np.bincount(
+        team_index * (last - first + 1) + weeks - first,
+        minlength=len(teams) * (last - first + 1),
+    ).reshape(len(teams), last - first + 1)
+
+    # week_numbers counts from the week of 1970-01-01, a thursday
+    mondays = pd.Timestamp(0) + pd.to_timedelta(
+        np.arange(first, last + 1) * 7 - 3, unit="D"
+    )
+    return pd.DataFrame(
+        counts,
+        index=pd.Index(teams, name="TEAM"),
+        columns=mondays.strftime("%Y-%m-%d"),
+    )
+
+
+def week_weights(
+    weeks: int, playoff_weeks: int = 0, playoff_weight: float = 1
+) -> np.ndarray:
+    # the last playoff_weeks weeks of the season count playoff_weight times
+    return np.where(
+        np.arange(weeks) >= weeks - playoff_weeks, playoff_weight, 1.0
+    )
+
+
+def team_schedule_weeks(games: pd.DataFrame, weights: np.ndarray) -> pd.Series:
+    # Weighted mean games per week for every team. Players only need their
+    # team's figure, so however many weeks there are this is one product
+    # over teams and a lookup per player.
+    return pd.Series(games.to_numpy() @ weights / weights.sum(), games.index)
+
+
+def apply_schedule(
+    config: FantasyConfig,
+    games: pd.DataFrame,
+    playoff_weeks: int = 0,
+    playoff_weight: float = 1,
+) -> FantasyConfig:
+    # copies each team's weighted games per week onto config, the league
+    # mean replaces mean_schedule_week for players without a team
+    if games.empty:
+        return config
+
+    schedule_weeks = team_schedule_weeks(
+        games, week_weights(games.shape[1], playoff_weeks, playoff_weight)
+    )
+
+    modified_config = config.model_copy(deep=True)
+    modified_config.team_schedule_week = {
+        team: float(week) for team, week in schedule_weeks.items()
+    }
+    modified_config.mean_schedule_week = float(schedule_weeks.mean())
+
+    return modified_config
+
+
+def player_schedule_weeks(
+    teams: pd.Series, config: FantasyConfig
+) -> np.ndarray:
+    # games per week for every player, mean_schedule_week for teams the
+    # schedule does not have
+    return (
+        teams.map(config.team_schedule_week)
+        .fillna(config.mean_schedule_week)
+        .to_numpy(dtype=float)
+    )
@@ -1,30 +1,218 @@
 import os
 import json
 import time
-from dagster import sensor, RunRequest, RunConfig
-
-from .configs import (
-    DagsterFantasyConfig,
-    base_fantasy_config,
-    POSITION_SLOTS,
-    CATEGORY_WEIGHTS,
+import hashlib
+import tempfile
+from dagster import (
+    sensor,
+    DefaultSensorStatus,
+    RunRequest,
+    RunConfig,
+    RunsFilter,
+    DagsterRunStatus,
+    MultiPartitionKey,
+    AddDynamicPartitionsRequest,
+    SensorEvaluationContext,
+    SensorResult,
+    SkipReason,
 )
-from .jobs import refresh_job, all_assets_job
+
+from .configs import DagsterFantasyConfig
+from .ingestion import validate_source
+from .jobs import reference_assets, reference_job, refresh_job
+from .partitions import source_partition, league_partition
 from .settings import settings
 
+PENDING_STATUSES = [
+    DagsterRunStatus.QUEUED,
+    DagsterRunStatus.NOT_STARTED,
+    DagsterRunStatus.STARTING,
+]
+
+
+def config_hash(config: dict) -> str:
+    return hashlib.sha256(
+        json.dumps(config, sort_keys=True).encode()
+    ).hexdigest()
+
+
+def cancel_pending_refreshes(
+    context: SensorEvaluationContext, partition_key: MultiPartitionKey
+):
+    # a newer config supersedes anything still waiting to run
+    pending = context.instance.get_runs(
+        filters=RunsFilter(
+            job_name=refresh_job.name,
+            statuses=PENDING_STATUSES,
+            tags={"dagster/partition": str(partition_key)},
+        )
+    )
+    for run in pending:
+        context.instance.run_coordinator.cancel_run(run.run_id)
+        context.log.info(f"cancelled stale refresh {run.run_id}")
+
+
+def new_partitions(
+    context: SensorEvaluationContext,
+    partition: str,
+    keys: set,
+) -> list:
+    registered = set(context.instance.get_dynamic_partitions(partition))
+    new_keys = sorted(keys - registered)
+    if not new_keys:
+        return []
+
+    return [AddDynamicPartitionsRequest(partition, new_keys)]
+
+
+def projection_sources(context: SensorEvaluationContext) -> set:
+    # files in DATA_DIR that load_source can read, leaving out the GAME_LOG
+    # and SCHEDULE files. Only unregistered files have their header read.
+    registered = set(
+        context.instance.get_dynamic_partitions(source_partition.name)
+    )
+    reference = {settings.game_log, settings.schedule}
+
+    sources = set()
+    for filename in os.listdir(settings.data_dir):
+        path = os.path.join(settings.data_dir, filename)
+        if filename in reference or not os.path.isfile(path):
+            continue
+
+        if filename not in registered:
+            try:
+                validate_source(path)
+            except (OSError, ValueError) as error:
+                context.log.debug(
+                    f"{filename} is not a projection source: {error}"
+                )
+                continue
+        sources.add(filename)
+
+    return sources
+
+
+def write_config(league: str, config: dict):
+    # written to a temporary file of its own first, so the sensor never
+    # reads half of it and the interface and draft server can both write
+    os.makedirs(settings.config_dir, exist_ok=True)
+    path = os.path.join(settings.config_dir, f"{league}.json")
+    fd, tmp_path = tempfile.mkstemp(dir=settings.config_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(config, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def ready_configs() -> dict:
+    # league name -> config, once the league's file has settled so a burst
+    # of edits only produces a run for the last one
+    if not os.path.isdir(settings.config_dir):
+        return {}
+
+    configs = {}
+    for filename in sorted(os.listdir(settings.config_dir)):
+        league, extension = os.path.splitext(filename)
+        path = os.path.join(settings.config_dir, filename)
+        if extension != ".json":
+            continue
+
+        quiet_for = time.time() - os.path.getmtime(path)
+        if quiet_for < settings.config_debounce:
+            continue
 
-@sensor(job=refresh_job, minimum_interval_seconds=2)
-def config_sensor():
-    if os.path.isfile(settings.custom_config):
-        # load config
-        with open(settings.custom_config) as f:
-            config = json.loads(json.load(f))
-            yield RunRequest(
-                run_key=str(time.time()),
-                partition_key="bob.csv",
-                job_name="refresh_job",
+        with open(path) as f:
+            configs[league] = json.load(f)
+        os.remove(path)
+
+    return configs
+
+
+def reference_version() -> str:
+    # the GAME_LOG and SCHEDULE files the reference assets read
+    files = {}
+    for setting, name in [
+        ("game_log", settings.game_log),
+        ("schedule", settings.schedule),
+    ]:
+        path = os.path.join(settings.data_dir, name)
+        if name and os.path.exists(path):
+            stat = os.stat(path)
+            files[setting] = [name, stat.st_mtime_ns, stat.st_size]
+        else:
+            files[setting] = name
+
+    return config_hash(files)
+
+
+def reference_ready(context: SensorEvaluationContext) -> bool:
+    return all(
+        context.instance.get_latest_materialization_event(asset.key) is not None
+        for asset in reference_assets
+    )
+
+
+@sensor(
+    job=reference_job,
+    minimum_interval_seconds=30,
+    default_status=DefaultSensorStatus.RUNNING,
+)
+def reference_sensor(context: SensorEvaluationContext):
+    version = reference_version()
+    if version == context.cursor:
+        return SkipReason("GAME_LOG and SCHEDULE are unchanged")
+
+    return SensorResult(run_requests=[RunRequest()], cursor=version)
+
+
+@sensor(job=refresh_job, minimum_interval_seconds=1)
+def config_sensor(context: SensorEvaluationContext):
+    # refreshes load the reference assets, configs wait until they exist
+    if not reference_ready(context):
+        return SkipReason("waiting for reference_sensor's first run")
+
+    cursor = json.loads(context.cursor) if context.cursor else {}
+    configs = ready_configs()
+
+    partition_requests = new_partitions(
+        context, source_partition.name, projection_sources(context)
+    ) + new_partitions(context, league_partition.name, set(configs))
+
+    run_requests = []
+    for league, config in configs.items():
+        source = config.pop("source", settings.source)
+        partition_key = MultiPartitionKey({"source": source, "league": league})
+
+        key = config_hash({"source": source, **config})
+        league_cursor = cursor.get(league, {})
+        if key == league_cursor.get("hash"):
+            continue
+
+        cancel_pending_refreshes(context, partition_key)
+
+        # the sequence lets a config run again after a different one was used
+        sequence = league_cursor.get("sequence", 0) + 1
+        run_requests.append(
+            RunRequest(
+                run_key=f"{league}:{key}:{sequence}",
+                partition_key=partition_key,
+                job_name=refresh_job.name,
                 run_config=RunConfig(
                     {"base_config": DagsterFantasyConfig(**config)}
                 ),
+                tags={"config_hash": key},
             )
-        os.remove(settings.custom_config)
+        )
+        cursor[league] = {"hash": key, "sequence": sequence}
+
+    if not run_requests and not partition_requests:
+        return SkipReason("no new configs or projection sources")
+
+    return SensorResult(
+        run_requests=run_requests,
+        dynamic_partitions_requests=partition_requests,
+        cursor=json.dumps(cursor),
+    )
@@ -5,7 +5,22 @@ from pydantic import Field
 class Settings(BaseSettings):
     data_dir: str = Field("./data", env="DATA_DIR")
     output_dir: str = Field("./output", env="OUTPUT_DIR")
-    custom_config: str = Field("./custom_config.json", env="CUSTOM_CONFIG")
+    config_dir: str = Field("./league_configs", env="CONFIG_DIR")
+    league: str = Field("default", env="LEAGUE")
+    source: str = Field("bob.csv", env="PROJECTION_SOURCE")
+    game_log: str = Field("", env="GAME_LOG")
+    schedule: str = Field("", env="SCHEDULE")
+    config_debounce: float = Field(0.5, env="CONFIG_DEBOUNCE")
+    cache_dir: str = Field("./cache", env="CACHE_DIR")
+    cache_size: int = Field(256 * 1024**2, env="CACHE_SIZE")
+    table_cache_entries: int = Field(32, env="TABLE_CACHE_ENTRIES")
+    ingest_chunksize: int = Field(100_000, env="INGEST_CHUNKSIZE")
+    debug: bool = Field(False, env="DEBUG")
+    trace_memory: bool = Field(False, env="TRACE_MEMORY")
+    draft_host: str = Field("127.0.0.1", env="DRAFT_HOST")
+    draft_port: int = Field(8765, env="DRAFT_PORT")
+    draft_dir: str = Field("./drafts", env="DRAFT_DIR")
+    draft_snapshot_interval: int = Field(25, env="DRAFT_SNAPSHOT_INTERVAL")
 
 
 settings = Settings()
@@ -0,0 +1,144 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from .configs import FantasyConfig, base_fantasy_config
+
+
+class SimulationResult(NamedTuple):
+    # one row per simulated draft with our roster's category totals, VALUE,
+    # money spent and number of players bought
+    rosters: pd.DataFrame
+    drafts_per_second: float
+
+
+def simulate_batch(
+    prices: np.ndarray,
+    our_prices: np.ndarray,
+    category_values: np.ndarray,
+    fantasy_teams: int,
+    salary_cap: int,
+    team_size: int,
+    drafts: int,
+    our_team: int,
+    price_noise: float,
+    nomination_noise: float,
+    seed: np.random.SeedSequence,
+) -> np.ndarray:
+    # Runs drafts auctions side by side, every array has drafts as its
+    # first axis so each nomination is a handful of array operations.
+    rng = np.random.default_rng(seed)
+    rows = np.arange(drafts)
+    nominations = min(fantasy_teams * team_size, len(prices))
+
+    # players come up roughly in order of market price
+    order = np.argsort(
+        -prices * rng.lognormal(0, nomination_noise, (drafts, len(prices))),
+        axis=1,
+    )[:, :nominations]
+
+    budget = np.full((drafts, fantasy_teams), float(salary_cap))
+    open_slots = np.full((drafts, fantasy_teams), team_size)
+    # category totals, VALUE, spent and players for our team
+    roster = np.zeros((drafts, category_values.shape[1] + 2))
+
+    for nomination in range(nominations):
+        player = order[:, nomination]
+
+        bids = prices[player][:, None] * rng.lognormal(
+            0, price_noise, (drafts, fantasy_teams)
+        )
+        bids[:, our_team] = our_prices[player]
+
+        # keep a dollar for every other open roster spot
+        max_bid = budget - (open_slots - 1)
+        bids = np.where(open_slots > 0, np.minimum(bids, max_bid), -np.inf)
+
+        winner = np.argmax(bids, axis=1)
+        top_bid = bids[rows, winner]
+        second_bid = np.partition(bids, -2, axis=1)[:, -2]
+        sold = np.isfinite(top_bid)
+
+        price = np.clip(second_bid + 1, 1, np.maximum(top_bid, 1))
+        price = np.where(sold, np.floor(price), 0)
+
+        budget[rows, winner] -= price
+        open_slots[rows, winner] -= sold
+
+        ours = sold & (winner == our_team)
+        roster[ours, :-2] += category_values[player[ours]]
+        roster[ours, -2] += price[ours]
+        roster[ours, -1] += 1
+
+    return roster
+
+
+def simulate_drafts(
+    salary_data: pd.DataFrame,
+    config: FantasyConfig = base_fantasy_config,
+    drafts: int = 1000,
+    seed: int = 0,
+    our_team: int = 0,
+    our_prices: np.ndarray = None,
+    price_noise: float = 0.25,
+    nomination_noise: float = 0.5,
+    batch_size: int = 250,
+    workers: int = None,
+) -> SimulationResult:
+    # salary_data SALARY is the market price prior, opponents bid around it
+    # with lognormal noise and our_prices (SALARY by default) is the most
+    # we pay for each player. Results only depend on the seed and
+    # batch_size, not on how many workers run the batches.
+    categories: List[str] = list(config.category_settings.keys())
+
+    prices = salary_data["SALARY"].to_numpy(dtype=float)
+    if our_prices is None:
+        our_prices = prices
+    category_values = salary_data[categories + ["VALUE"]].to_numpy(dtype=float)
+
+    batches = [
+        min(batch_size, drafts - start)
+        for start in range(0, drafts, batch_size)
+    ]
+    seeds = np.random.SeedSequence(seed).spawn(len(batches))
+    arguments = [
+        (
+            prices,
+            np.asarray(our_prices, dtype=float),
+            category_values,
+            config.fantasy_teams,
+            config.salary_cap,
+            config.team_size,
+            batch,
+            our_team,
+            price_noise,
+            nomination_noise,
+            batch_seed,
+        )
+        for batch, batch_seed in zip(batches, seeds)
+    ]
+
+    start = time.perf_counter()
+    workers = min(workers or os.cpu_count() or 1, len(batches))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(simulate_batch, *zip(*arguments)))
+    else:
+        results = [simulate_batch(*batch) for batch in arguments]
+    elapsed = time.perf_counter() - start
+
+    columns = categories + ["VALUE", "SPENT", "PLAYERS"]
+    rosters = pd.DataFrame(
+        np.concatenate(results) if results else np.empty((0, len(columns))),
+        columns=columns,
+    )
+    rosters.index.name = "DRAFT"
+
+    return SimulationResult(
+        rosters=rosters,
+        drafts_per_second=drafts / elapsed if elapsed else float("inf"),
+    )
@@ -0,0 +1,619 @@
+import json
+from typing import List, NamedTuple
+
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.preprocessing import PowerTransformer
+
+from .cache import DiskCache
+from .configs import FantasyConfig
+from .schedule import player_schedule_weeks
+from .transformations import calculate_percentage_value, calculate_z_scores
+
+GAMES_IN_SEASON = 82
+
+
+def normalise_projections(
+    projections: pd.DataFrame,
+    config: FantasyConfig,
+    cache: DiskCache = None,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    if cache is None:
+        return fit_normalisation(projections, config)
+
+    key = normalisation_key(projections, config)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached["normalised_data"], cached["lambdas"]
+
+    normalised_data, lambdas = fit_normalisation(projections, config)
+    cache.put(key, {"normalised_data": normalised_data, "lambdas": lambdas})
+    return normalised_data, lambdas
+
+
+def normalisation_key(projections: pd.DataFrame, config: FantasyConfig) -> str:
+    # everything the Yeo-Johnson fits depend on, weights, slots and the
+    # blacklist are left out so refreshes that only change those hit
+    columns = config.metadata_columns + list(config.category_settings.keys())
+    inputs = {
+        "team_fg": config.team_fg,
+        "team_ft": config.team_ft,
+        "mean_schedule_week": config.mean_schedule_week,
+        "team_schedule_week": config.team_schedule_week,
+        "columns": columns,
+        "positions": {
+            pos: position.eligible_positions
+            for pos, position in config.position_settings.items()
+        },
+        "sklearn": sklearn.__version__,
+        "layout": "position_mask",
+    }
+
+    return DiskCache.key(
+        pd.util.hash_pandas_object(projections[columns + ["FGA", "FTA"]])
+        .to_numpy()
+        .tobytes(),
+        json.dumps(inputs, sort_keys=True).encode(),
+    )
+
+
+def fit_normalisation(
+    projections: pd.DataFrame, config: FantasyConfig
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    # One row per player with the weekly category totals, not yet
+    # transformed, and a bitmask of the positions they are eligible at,
+    # plus a positions x categories table of Yeo-Johnson lambdas.
+    # to_normalised_matrix applies each position's lambdas, the
+    # standardisation is left out as g-scores are z-scores again.
+    positions = list(config.position_settings.keys())
+    categories = list(config.category_settings.keys())
+
+    # players without a POS can't fill a slot, normalised_data leaves them
+    # out and the assets report how many were dropped
+    load_data = projections.dropna(subset=["POS"]).copy()
+
+    load_data["FG%"] = calculate_percentage_value(
+        attempts=load_data["FGA"],
+        percent=load_data["FG%"],
+        team_percent=config.team_fg,
+    )
+
+    load_data["FT%"] = calculate_percentage_value(
+        attempts=load_data["FTA"],
+        percent=load_data["FT%"],
+        team_percent=config.team_ft,
+    )
+
+    normalised_data = load_data[config.metadata_columns].copy()
+    for column in normalised_data.select_dtypes(include="object"):
+        normalised_data[column] = normalised_data[column].astype("category")
+    normalised_data["POS_MASK"] = position_masks(normalised_data["POS"], config)
+
+    weekly = (
+        load_data[categories].to_numpy(dtype=float)
+        * player_schedule_weeks(load_data["TEAM"], config)[:, None]
+    )
+    eligible = eligible_positions(normalised_data["POS_MASK"], len(positions))
+
+    pt = PowerTransformer(method="yeo-johnson", standardize=False)
+    lambdas = pd.DataFrame(
+        [
+            pt.fit(weekly[eligible[:, i]]).lambdas_
+            for i in range(len(positions))
+        ],
+        index=positions,
+        columns=categories,
+    )
+
+    normalised_data[categories] = weekly.astype(np.float32)
+
+    return normalised_data, lambdas
+
+
+def position_masks(pos: pd.Series, config: FantasyConfig) -> np.ndarray:
+    # bit i is set when the player can play the league's i-th position,
+    # worked out once per distinct POS string rather than per player
+    positions = list(config.position_settings.keys())
+    position_bits = {
+        position: sum(
+            1 << positions.index(eligible)
+            for eligible in settings.eligible_positions
+            if eligible in positions
+        )
+        for position, settings in config.position_settings.items()
+    }
+
+    pos = pos.astype("category")
+    if pos.isna().any():
+        raise ValueError(f"{pos.isna().sum()} players have no POS")
+    unknown = sorted(
+        {p for value in pos.cat.categories for p in value.split("/")}
+        - set(position_bits)
+    )
+    if unknown:
+        raise ValueError(
+            f"Unknown positions {unknown}, expected one of "
+            f"{list(position_bits)}"
+        )
+
+    lookup = np.array(
+        [
+            np.bitwise_or.reduce([position_bits[p] for p in value.split("/")])
+            for value in pos.cat.categories
+        ],
+        dtype=np.uint16,
+    )
+
+    return lookup[pos.cat.codes.to_numpy()]
+
+
+def eligible_positions(masks: pd.Series, position_count: int) -> np.ndarray:
+    masks = np.asarray(masks, dtype=np.uint16)
+    return (
+        masks[:, None] >> np.arange(position_count, dtype=np.uint16)
+    ) & 1 == 1
+
+
+def yeo_johnson(values: np.ndarray, lambdas: np.ndarray) -> np.ndarray:
+    # the transform PowerTransformer applies, for arrays of lambdas
+    eps = np.spacing(1.0)
+    positive = values >= 0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(
+            positive,
+            np.where(
+                np.abs(lambdas) < eps,
+                np.log1p(np.where(positive, values, 0)),
+                (np.power(np.where(positive, values, 0) + 1, lambdas) - 1)
+                / lambdas,
+            ),
+            np.where(
+                np.abs(lambdas - 2) < eps,
+                -np.log1p(-np.where(positive, 0, values)),
+                -(np.power(1 - np.where(positive, 0, values), 2 - lambdas) - 1)
+                / (2 - lambdas),
+            ),
+        )
+
+
+class PositionalMatrix(NamedTuple):
+    # one row per player holding the non positional metadata columns
+    players: pd.DataFrame
+    # players x positions x categories, NaN where a player is not eligible
+    values: np.ndarray
+    # players x positions
+    eligible: np.ndarray
+    positions: List[str]
+    categories: List[str]
+
+
+def to_positional_matrix(
+    positional_data: pd.DataFrame,
+    positions: List[str],
+    categories: List[str],
+    metadata_columns: List[str],
+    player_names: pd.Index = None,
+) -> PositionalMatrix:
+    # player_names lines the matrix up with another one built over a larger
+    # pool, players missing from positional_data are left ineligible
+    if player_names is None:
+        player_codes, player_names = pd.factorize(positional_data["PLAYER"])
+    else:
+        player_codes = pd.Index(player_names).get_indexer(
+            positional_data["PLAYER"]
+        )
+    position_codes = pd.Index(positions).get_indexer(positional_data["POS"])
+
+    values = np.full(
+        (len(player_names), len(positions), len(categories)), np.nan
+    )
+    values[player_codes, position_codes] = positional_data[categories].to_numpy(
+        dtype=float
+    )
+
+    eligible = np.zeros((len(player_names), len(positions)), dtype=bool)
+    eligible[player_codes, position_codes] = True
+
+    codes, first_rows = np.unique(player_codes, return_index=True)
+    players = positional_data[
+        [col for col in metadata_columns if col != "POS"]
+    ].iloc[first_rows]
+    if len(codes) < len(player_names):
+        players = players.set_index(codes).reindex(range(len(player_names)))
+        players["PLAYER"] = player_names
+    players = players.reset_index(drop=True)
+
+    return PositionalMatrix(players, values, eligible, positions, categories)
+
+
+def to_normalised_matrix(
+    normalised_data: pd.DataFrame,
+    lambdas: pd.DataFrame,
+    positions: List[str],
+    categories: List[str],
+    metadata_columns: List[str],
+) -> PositionalMatrix:
+    eligible = eligible_positions(normalised_data["POS_MASK"], len(positions))
+    lambdas = lambdas.loc[positions, categories].to_numpy(dtype=float)
+
+    values = yeo_johnson(
+        normalised_data[categories].to_numpy(dtype=float)[:, None, :], lambdas
+    )
+    values = np.where(eligible[..., None], values, np.nan)
+
+    players = normalised_data[
+        [col for col in metadata_columns if col != "POS"]
+    ].reset_index(drop=True)
+
+    return PositionalMatrix(players, values, eligible, positions, categories)
+
+
+def from_positional_matrix(
+    matrix: PositionalMatrix,
+    values: np.ndarray,
+    columns: List[str],
+    value: np.ndarray = None,
+) -> pd.DataFrame:
+    # rows come out grouped by position name, keeping player order within
+    # each position, the same layout groupby("POS").apply produced
+    player_idx, position_idx = [], []
+    for position_i in np.argsort(matrix.positions, kind="stable"):
+        players_i = np.flatnonzero(matrix.eligible[:, position_i])
+        player_idx.append(players_i)
+        position_idx.append(np.full(len(players_i), position_i))
+
+    player_idx = np.concatenate(player_idx)
+    position_idx = np.concatenate(position_idx)
+
+    positional_data = matrix.players.iloc[player_idx].reset_index(drop=True)
+    positional_data["POS"] = pd.Categorical.from_codes(
+        position_idx, categories=matrix.positions
+    )
+    positional_data[matrix.categories] = values[
+        player_idx, position_idx
+    ].astype(np.float32)
+    if value is not None:
+        positional_data["VALUE"] = value[player_idx, position_idx].astype(
+            np.float32
+        )
+
+    return positional_data[columns]
+
+
+def position_z_scores(values: np.ndarray, eligible: np.ndarray) -> np.ndarray:
+    # eligible may carry leading axes, one per player pool, e.g. the full
+    # pool and the pool left after the blacklist, scored in the same pass
+    valid = eligible[..., None] & ~np.isnan(values)
+    count = valid.sum(axis=-3, keepdims=True)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(valid, values, 0).sum(axis=-3, keepdims=True) / count
+        deviation = np.where(valid, values - mean, 0)
+        std = np.sqrt((deviation**2).sum(axis=-3, keepdims=True) / (count - 1))
+        z_scores = deviation / std
+
+    return np.where(valid, z_scores, np.nan)
+
+
+def position_g_scores(
+    values: np.ndarray, eligible: np.ndarray, week_variability: np.ndarray
+) -> np.ndarray:
+    return position_z_scores(values, eligible) * week_variability
+
+
+def aggregate_player_values(
+    g_scores: np.ndarray,
+    eligible: np.ndarray,
+    games_played: np.ndarray,
+    weights: np.ndarray,
+    slots: np.ndarray,
+    total_slots: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    # leading axes on g_scores/eligible line up with leading axes on the
+    # weight and slot vectors, so several valuations run in one pass
+    weighted = np.nan_to_num(g_scores * weights[..., None, None, :])
+
+    percent_gp = games_played / GAMES_IN_SEASON
+    positional_value = weighted.sum(axis=-1) * percent_gp[:, None]
+
+    slot_weights = np.where(eligible, slots[..., None, :], 0)
+    slot_totals = np.where(eligible, total_slots[..., None, :], 0).sum(axis=-1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        categories = (
+            np.einsum("...npc,...np->...nc", weighted, slot_weights)
+            / slot_totals[..., None]
+        )
+        value = (positional_value * slot_weights).sum(axis=-1) / slot_totals
+
+    return categories, value
+
+
+def punt_order(punt_scores: np.ndarray) -> np.ndarray:
+    # category indices per player, the most puntable category first
+    return np.argsort(-punt_scores, axis=1, kind="stable")
+
+
+def peak_values(
+    category_values: np.ndarray,
+    value: np.ndarray,
+    order: np.ndarray,
+    min_categories: int = 6,
+) -> np.ndarray:
+    # the best of VALUE and VALUE with the most puntable categories taken
+    # off in order, scaled by the punt penalty for that many
+    scored = category_values.shape[1]
+    rows = np.arange(len(value))
+
+    peak = value.copy()
+    punted_value = value.copy()
+    for punted in range(scored - max(min_categories, scored - 1)):
+        punted_value = punted_value - category_values[rows, order[:, punted]]
+        punt_value = punted_value * punt_penalty(scored, punted + 1)
+        peak = np.where(punt_value > peak, punt_value, peak)
+
+    return peak
+
+
+def punt_penalty(scored, punts: int):
+    # the factor a value is scaled by once punts of the scored categories
+    # are taken off it, the k-th punt counting from 0 costs
+    # (scored - k) / scored. scored can be an array.
+    scored = np.asarray(scored, dtype=float)
+    penalty = np.ones_like(scored)
+    for punted in range(punts):
+        penalty = penalty * (scored - punted) / scored
+    return penalty
+
+
+def category_vector(config: FantasyConfig, attribute: str) -> np.ndarray:
+    return np.array(
+        [
+            getattr(settings, attribute)
+            for settings in config.category_settings.values()
+        ],
+        dtype=float,
+    )
+
+
+def slot_vector(config: FantasyConfig) -> np.ndarray:
+    return np.array(
+        [settings.slots for settings in config.position_settings.values()],
+        dtype=float,
+    )
+
+
+def blended_slot_vector(
+    config: FantasyConfig, base_config: FantasyConfig
+) -> np.ndarray:
+    # custom slots for the starting lineup, default slots for the bench
+    team_size = base_config.team_size
+    bench_size = base_config.bench_size
+
+    return slot_vector(config) * (
+        (team_size - bench_size) / team_size
+    ) + slot_vector(base_config) * (bench_size / team_size)
+
+
+def positional_values(
+    normalised_data: pd.DataFrame,
+    lambdas: pd.DataFrame,
+    config: FantasyConfig,
+    blacklist: List[str],
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    # one pass for both the full pool and the pool left after the blacklist
+    positions = list(config.position_settings.keys())
+    categories = list(config.category_settings.keys())
+
+    matrix = to_normalised_matrix(
+        normalised_data,
+        lambdas,
+        positions,
+        categories,
+        config.metadata_columns,
+    )
+    available = ~matrix.players["PLAYER"].isin(blacklist).to_numpy()
+    eligible = np.stack([matrix.eligible, matrix.eligible & available[:, None]])
+
+    g_scores = position_g_scores(
+        matrix.values,
+        eligible,
+        category_vector(config, "week_variability"),
+    )
+
+    return tuple(
+        from_positional_matrix(
+            matrix._replace(eligible=pool_eligible),
+            pool_g_scores,
+            config.metadata_columns + categories + ["VALUE"],
+            value=np.nansum(pool_g_scores, axis=-1),
+        )
+        for pool_eligible, pool_g_scores in zip(eligible, g_scores)
+    )
+
+
+def player_values(
+    positional_data: pd.DataFrame,
+    bl_positional_data: pd.DataFrame,
+    player_positions: pd.DataFrame,
+    config: FantasyConfig,
+    base_config: FantasyConfig,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    # the full pool is valued with the league defaults, the pool left after
+    # the blacklist with the custom weights and slots, both in one pass
+    positions = list(config.position_settings.keys())
+    categories = list(config.category_settings.keys())
+
+    matrix = to_positional_matrix(
+        positional_data, positions, categories, config.metadata_columns
+    )
+    bl_matrix = to_positional_matrix(
+        bl_positional_data,
+        positions,
+        categories,
+        config.metadata_columns,
+        player_names=matrix.players["PLAYER"],
+    )
+
+    category_values, value = aggregate_player_values(
+        np.stack([matrix.values, bl_matrix.values]),
+        np.stack([matrix.eligible, bl_matrix.eligible]),
+        matrix.players["GP"].to_numpy(dtype=float),
+        weights=np.stack(
+            [
+                category_vector(base_config, "weight"),
+                category_vector(config, "weight"),
+            ]
+        ),
+        slots=np.stack(
+            [
+                slot_vector(base_config),
+                blended_slot_vector(config, base_config),
+            ]
+        ),
+        total_slots=slot_vector(base_config),
+    )
+
+    available = bl_matrix.eligible.any(axis=1)
+
+    value_data = to_player_frame(
+        matrix.players,
+        category_values[0],
+        value[0],
+        categories,
+        player_positions,
+    )
+    bl_value_data = to_player_frame(
+        matrix.players[available],
+        category_values[1][available],
+        value[1][available],
+        categories,
+        player_positions,
+    )
+
+    return value_data, bl_value_data
+
+
+def player_contributions(
+    bl_positional_data: pd.DataFrame,
+    player_positions: pd.DataFrame,
+    config: FantasyConfig,
+    base_config: FantasyConfig,
+) -> pd.DataFrame:
+    # Each available player's slot weighted g-score per category before
+    # weights and games played, VALUE = GP / 82 * contributions @ weights
+    # for any weights with the custom slots. VALUE is for config's weights.
+    positions = list(config.position_settings.keys())
+    categories = list(config.category_settings.keys())
+
+    matrix = to_positional_matrix(
+        bl_positional_data, positions, categories, config.metadata_columns
+    )
+    games_played = matrix.players["GP"].to_numpy(dtype=float)
+
+    contributions, _ = aggregate_player_values(
+        matrix.values,
+        matrix.eligible,
+        games_played,
+        weights=np.ones(len(categories)),
+        slots=blended_slot_vector(config, base_config),
+        total_slots=slot_vector(base_config),
+    )
+    value = (
+        np.nan_to_num(contributions) @ category_vector(config, "weight")
+    ) * (games_played / GAMES_IN_SEASON)
+
+    return to_player_frame(
+        matrix.players, contributions, value, categories, player_positions
+    )
+
+
+def to_player_frame(
+    players: pd.DataFrame,
+    category_values: np.ndarray,
+    value: np.ndarray,
+    categories: List[str],
+    player_positions: pd.DataFrame,
+) -> pd.DataFrame:
+    player_data = pd.DataFrame(category_values, columns=categories)
+    player_data["VALUE"] = value
+    player_data = pd.concat(
+        [player_data, players.reset_index(drop=True)], axis=1
+    )
+    player_data = player_data.sort_values(
+        by="PLAYER", kind="stable"
+    ).reset_index(drop=True)
+
+    return pd.merge(
+        player_data, player_positions[["PLAYER", "POS"]], on="PLAYER"
+    )
+
+
+def salaries(
+    value_data: pd.DataFrame,
+    punt_value: pd.DataFrame,
+    config: FantasyConfig,
+) -> pd.DataFrame:
+    salary_data = value_data.copy()
+    categories = list(config.category_settings.keys())
+
+    c_scored_cats = [
+        cat for cat in categories if config.category_settings[cat].weight
+    ]
+
+    # argsort of every player's punt scores, looked up by integer player id
+    player_ids = pd.Index(punt_value["PLAYER"]).get_indexer(
+        salary_data["PLAYER"]
+    )
+    order = punt_order(punt_value[c_scored_cats].to_numpy(dtype=float))
+
+    salary_data["VALUE"] = peak_values(
+        salary_data[c_scored_cats].to_numpy(dtype=float),
+        salary_data["VALUE"].to_numpy(dtype=float),
+        order[player_ids],
+    )
+
+    spent = list(config.blacklist.values())
+    top_values = salary_data.sort_values(by="VALUE", ascending=False).head(
+        max(config.total_drafted_players, 20)
+    )
+
+    salary_data["SALARY"] = (
+        top_values["VALUE"]
+        * ((config.fantasy_teams * config.salary_cap) - sum(spent))
+        / top_values["VALUE"].sum()
+    )
+
+    salary_data["SALARY"] = salary_data["SALARY"].where(
+        salary_data["SALARY"] > 1, 1
+    )
+
+    salary_data = salary_data[
+        config.metadata_columns + categories + ["VALUE", "SALARY"]
+    ]
+    return salary_data.sort_values(by="VALUE", ascending=False)
+
+
+def punt_totals(
+    value_data: pd.DataFrame, categories: List[str]
+) -> pd.DataFrame:
+    punt_data = value_data.copy()
+
+    for category in categories:
+        punt_data[category] = (
+            value_data[categories].sum(axis=1) - value_data[category]
+        )
+
+    return punt_data
+
+
+def punt_scores(punt_data: pd.DataFrame, categories: List[str]) -> pd.DataFrame:
+    punt_value = punt_data.copy()
+
+    punt_value[categories + ["VALUE"]] = punt_data[
+        categories + ["VALUE"]
+    ].apply(calculate_z_scores)
+
+    return punt_value
@@ -0,0 +1,227 @@
+import os
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from .cache import DiskCache
+from .configs import FantasyConfig
+from .ingestion import COUNTING_STATS, GAME_LOG_COLUMNS, read_chunks
+
+WEEK_STATS = ["GAMES"] + COUNTING_STATS
+
+# percentage categories are valued on makes above the league rate
+PERCENTAGE_STATS = {"FG%": ("FGM", "FGA"), "FT%": ("FTM", "FTA")}
+
+VARIABILITY_COLUMNS = ["MEAN", "WITHIN", "BETWEEN", "WEEK_VARIABILITY"]
+
+
+def week_numbers(dates: pd.Series) -> pd.Series:
+    # weeks run monday to sunday, 1970-01-01 was a thursday, NaN for dates
+    # that do not parse
+    days = (pd.to_datetime(dates, errors="coerce") - pd.Timestamp(0)).dt.days
+    return (days + 3) // 7
+
+
+class WeekVariance:
+    # Per player counts, means and sums of squared deviations of weekly
+    # totals, plus the makes/attempts co-moments the percentage categories
+    # need. Weeks are merged in with Chan's parallel update once a later
+    # week has started, so date ordered logs only keep the current week of
+    # games in memory. Unordered logs keep every week until finish.
+
+    def __init__(self, ordered: bool = True):
+        self.ordered = ordered
+        self.merged_through = -np.inf
+        self.count = pd.Series(dtype=float)
+        self.mean = pd.DataFrame(columns=WEEK_STATS, dtype=float)
+        self.m2 = pd.DataFrame(columns=WEEK_STATS, dtype=float)
+        self.comoment = pd.DataFrame(
+            columns=list(PERCENTAGE_STATS), dtype=float
+        )
+        self.open_weeks = None
+
+    def add_games(self, games: pd.DataFrame):
+        games = games.assign(
+            WEEK=week_numbers(games["GAME_DATE"]), GAMES=1
+        ).dropna(subset=["WEEK"])
+        weeks = games.groupby(["PLAYER", "WEEK"])[WEEK_STATS].sum()
+
+        if self.open_weeks is not None:
+            weeks = self.open_weeks.add(weeks, fill_value=0)
+
+        if not self.ordered:
+            self.open_weeks = weeks
+            return
+
+        first_week = games["WEEK"].min()
+        if first_week < self.merged_through:
+            raise ValueError("game log is not in date order, use ordered=False")
+
+        complete = weeks.index.get_level_values("WEEK") < first_week
+        self.open_weeks = weeks[~complete]
+        self._merge(weeks[complete])
+        self.merged_through = max(self.merged_through, first_week)
+
+    def finish(self) -> "WeekVariance":
+        if self.open_weeks is not None:
+            self._merge(self.open_weeks)
+            self.open_weeks = None
+
+        return self
+
+    def _merge(self, weeks: pd.DataFrame):
+        if weeks.empty:
+            return
+
+        players = weeks.groupby(level="PLAYER")
+        count_b = players.size().astype(float)
+        mean_b = players.mean()
+        deviation = weeks - mean_b.reindex(weeks.index, level="PLAYER")
+        m2_b = (deviation**2).groupby(level="PLAYER").sum()
+        comoment_b = pd.DataFrame(
+            {
+                category: (deviation[made] * deviation[attempts])
+                .groupby(level="PLAYER")
+                .sum()
+                for category, (made, attempts) in PERCENTAGE_STATS.items()
+            }
+        )
+
+        index = self.count.index.union(count_b.index)
+        count_a = self.count.reindex(index, fill_value=0)
+        count_b = count_b.reindex(index, fill_value=0)
+        count = count_a + count_b
+
+        delta = mean_b.reindex(index).fillna(0) - self.mean.reindex(
+            index
+        ).fillna(0)
+        mean_a = self.mean.reindex(index).fillna(0)
+        share = (count_a * count_b / count).to_numpy()[:, None]
+
+        self.mean = mean_a + delta * (count_b / count).to_numpy()[:, None]
+        self.m2 = (
+            self.m2.reindex(index).fillna(0)
+            + m2_b.reindex(index).fillna(0)
+            + delta**2 * share
+        )
+        self.comoment = (
+            self.comoment.reindex(index).fillna(0)
+            + comoment_b.reindex(index).fillna(0)
+            + pd.DataFrame(
+                {
+                    category: delta[made] * delta[attempts]
+                    for category, (made, attempts) in PERCENTAGE_STATS.items()
+                }
+            )
+            * share
+        )
+        self.count = count
+
+    def category_moments(
+        self, categories: List[str]
+    ) -> tuple[pd.DataFrame, pd.DataFrame]:
+        # per player weekly means and sums of squares for each category,
+        # percentage categories as makes minus attempts at the league rate
+        means = pd.DataFrame(index=self.count.index)
+        m2 = pd.DataFrame(index=self.count.index)
+
+        for category in categories + ["GAMES"]:
+            if category in PERCENTAGE_STATS:
+                made, attempts = PERCENTAGE_STATS[category]
+                rate = (self.mean[made] * self.count).sum() / (
+                    self.mean[attempts] * self.count
+                ).sum()
+                means[category] = self.mean[made] - rate * self.mean[attempts]
+                m2[category] = (
+                    self.m2[made]
+                    - 2 * rate * self.comoment[category]
+                    + rate**2 * self.m2[attempts]
+                )
+            else:
+                means[category] = self.mean[category]
+                m2[category] = self.m2[category]
+
+        return means, m2
+
+    def player_variability(self, categories: List[str]) -> pd.DataFrame:
+        # week to week standard deviation of each player's weekly totals
+        _, m2 = self.category_moments(categories)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.sqrt(m2.div(self.count - 1, axis=0)).where(self.count > 1)
+
+    def category_variability(
+        self, categories: List[str], min_weeks: int = 2
+    ) -> pd.DataFrame:
+        # The g-score factor for each category, sqrt(between / (between +
+        # within)), from the pooled week to week variance of players with
+        # at least min_weeks weeks and the variance of their weekly means.
+        means, m2 = self.category_moments(categories)
+        players = self.count >= max(min_weeks, 2)
+
+        variability = pd.DataFrame(
+            {
+                "MEAN": means[players].mean(),
+                "WITHIN": m2[players].sum() / (self.count[players] - 1).sum(),
+                "BETWEEN": means[players].var(),
+            }
+        )
+        variability["WEEK_VARIABILITY"] = np.sqrt(
+            variability["BETWEEN"]
+            / (variability["BETWEEN"] + variability["WITHIN"])
+        )
+        variability.loc["GAMES", "WEEK_VARIABILITY"] = np.nan
+
+        return variability.rename_axis("CATEGORY")
+
+
+def estimate_week_variability(
+    path: str,
+    categories: List[str],
+    chunksize: int = None,
+    ordered: bool = True,
+    cache: DiskCache = None,
+) -> pd.DataFrame:
+    if cache is not None:
+        stat = os.stat(path)
+        key = DiskCache.key(
+            os.path.abspath(path).encode(),
+            f"{stat.st_mtime_ns}:{stat.st_size}".encode(),
+            ",".join(categories).encode(),
+            str(ordered).encode(),
+        )
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    week_variance = WeekVariance(ordered)
+    for games in read_chunks(
+        path, GAME_LOG_COLUMNS + ["GAME_DATE"], [], chunksize
+    ):
+        week_variance.add_games(games)
+
+    variability = week_variance.finish().category_variability(categories)
+
+    if cache is not None:
+        cache.put(key, variability)
+    return variability
+
+
+def apply_week_variability(
+    config: FantasyConfig, variability: pd.DataFrame
+) -> FantasyConfig:
+    # copies the estimates onto config, categories without one keep theirs
+    if variability.empty:
+        return config
+
+    modified_config = config.model_copy(deep=True)
+    for category, settings in modified_config.category_settings.items():
+        estimate = variability["WEEK_VARIABILITY"].get(category, np.nan)
+        if np.isfinite(estimate):
+            settings.week_variability = float(estimate)
+
+    games = variability["MEAN"].get("GAMES", np.nan)
+    if np.isfinite(games):
+        modified_config.mean_schedule_week = float(games)
+
+    return modified_config
@@ -0,0 +1,290 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from fantasy_nba.configs import (
+    CATEGORY_WEIGHTS,
+    POSITION_SLOTS,
+    base_fantasy_config,
+    customise_config,
+)
+from fantasy_nba.ingestion import load_source
+from fantasy_nba.punts import player_punts
+from fantasy_nba.settings import settings
+from fantasy_nba.valuation import (
+    normalise_projections,
+    player_contributions,
+    player_values,
+    positional_values,
+    punt_scores,
+    punt_totals,
+    salaries,
+)
+
+CATEGORIES = list(base_fantasy_config.category_settings.keys())
+SIZES = [500, 5_000, 50_000, 500_000]
+TEMPLATE = os.path.join(os.path.dirname(__file__), "..", "data", "bob.csv")
+THRESHOLDS = os.path.join(
+    os.path.dirname(__file__), "benchmark_thresholds.json"
+)
+
+COUNTING_STATS = [
+    "MPG",
+    "FGM",
+    "FGA",
+    "FTM",
+    "FTA",
+    "3PM",
+    "PTS",
+    "REB",
+    "AST",
+    "STL",
+    "BLK",
+    "TO",
+    "TOTAL",
+]
+
+
+def synthetic_projections(
+    players: int, template: pd.DataFrame, seed: int = 0
+) -> pd.DataFrame:
+    # Bootstraps rows of a real projection file and jitters the stats,
+    # percentages are recomputed from makes and attempts so they stay
+    # consistent. Player names are unique, positions keep the real mix.
+    rng = np.random.default_rng(seed)
+    data = template.sample(
+        n=players, replace=True, random_state=rng
+    ).reset_index(drop=True)
+
+    data[COUNTING_STATS] = data[COUNTING_STATS] * rng.lognormal(
+        0, 0.15, (players, len(COUNTING_STATS))
+    )
+    data["GP"] = np.clip(data["GP"] + rng.integers(-5, 6, players), 1, 82)
+    data["FGM"] = np.minimum(data["FGM"], data["FGA"])
+    data["FTM"] = np.minimum(data["FTM"], data["FTA"])
+    data["FG%"] = data["FGM"] / data["FGA"]
+    data["FT%"] = data["FTM"] / data["FTA"]
+
+    data = data.sort_values("TOTAL", ascending=False, ignore_index=True)
+    data["RANK"] = np.arange(1, players + 1)
+    data["ADP"] = data["RANK"] * rng.lognormal(0, 0.2, players)
+    data["PLAYER"] = [f"Player {rank:07d}" for rank in data["RANK"]]
+
+    return data[template.columns]
+
+
+def measure(function, *args, memory: bool = True):
+    # one run for the wall time and, separately, one under tracemalloc
+    # since tracing every allocation slows the numpy heavy stages down
+    start = time.perf_counter()
+    result = function(*args)
+    seconds = time.perf_counter() - start
+
+    peak_mib = None
+    if memory:
+        tracemalloc.start()
+        function(*args)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peak_mib = peak / 1024**2
+
+    return result, {"seconds": seconds, "peak_mib": peak_mib}
+
+
+def asset_stages(path: str, config, memory: bool = True):
+    # the functions behind each asset, called with the same arguments as
+    # the assets pass them but without the dagster runtime or caches
+    timings = {}
+
+    def stage(name, function, *args):
+        result, timings[name] = measure(function, *args, memory=memory)
+        return result
+
+    load_data = stage("load_data", load_source, path)
+    normalised_data, lambdas = stage(
+        "normalised_data", normalise_projections, load_data, config
+    )
+    positional_data, bl_positional_data = stage(
+        "positional_value_assets",
+        positional_values,
+        normalised_data,
+        lambdas,
+        base_fantasy_config,
+        list(config.blacklist.keys()),
+    )
+    value_data, bl_value_data = stage(
+        "value_assets",
+        player_values,
+        positional_data,
+        bl_positional_data,
+        load_data[["PLAYER", "POS"]],
+        config,
+        base_fantasy_config,
+    )
+    punt_data = stage("punt_data", punt_totals, value_data, CATEGORIES)
+    punt_value = stage("punt_value", punt_scores, punt_data, CATEGORIES)
+    stage("salary_data", salaries, bl_value_data, punt_value, config)
+    stage(
+        "contribution_data",
+        player_contributions,
+        bl_positional_data,
+        load_data[["PLAYER", "POS"]],
+        config,
+        base_fantasy_config,
+    )
+    stage("punt_combination_data", player_punts, value_data, config)
+
+    return timings, value_data
+
+
+def interface_stages(path: str, team: pd.DataFrame, memory: bool = True):
+    # the streamlit helpers run fine in bare mode, session state is then a
+    # plain per process store
+    try:
+        import interface
+    except ImportError:
+        return {}
+
+    st = interface.st
+    saved_settings = settings.model_dump()
+    settings.data_dir, settings.source = os.path.split(path)
+    settings.config_dir = tempfile.mkdtemp()
+
+    st.session_state.weights = CATEGORY_WEIGHTS.copy()
+    st.session_state.slots = POSITION_SLOTS.copy()
+    st.session_state.blacklist = {}
+    st.session_state.team = team
+
+    def load_projections():
+        interface.table_cache().tables.clear()
+        return interface.load_projections()
+
+    def refresh_data():
+        # a full refresh, the normalisation cache is switched off below as
+        # every run after the first would otherwise be a cache hit
+        st.session_state.valuation = None
+        interface.refresh_data()
+
+    normalisation_cache = interface.normalisation_cache
+    interface.normalisation_cache = None
+
+    timings = {}
+    try:
+        for name, function, args in [
+            ("load_projections", load_projections, ()),
+            ("refresh_data", refresh_data, ()),
+            ("optimise_slots", interface.optimise_slots, (team,)),
+            ("get_punt", interface.get_punt, (team,)),
+        ]:
+            _, timings[name] = measure(function, *args, memory=memory)
+    finally:
+        interface.normalisation_cache = normalisation_cache
+        for field, value in saved_settings.items():
+            setattr(settings, field, value)
+
+    return timings
+
+
+def check_thresholds(results: list, thresholds: dict) -> list:
+    failures = []
+    for result in results:
+        limits = thresholds.get(result["stage"], {}).get(
+            str(result["players"]), {}
+        )
+        for metric, limit in limits.items():
+            if result.get(metric) is not None and result[metric] > limit:
+                failures.append({**result, "metric": metric, "limit": limit})
+
+    return failures
+
+
+def run_benchmark(
+    sizes: list = SIZES,
+    data_dir: str = None,
+    thresholds: dict = None,
+    memory: bool = True,
+    interface: bool = True,
+) -> dict:
+    data_dir = data_dir or tempfile.mkdtemp()
+    template = pd.read_csv(TEMPLATE)
+    # the top synthetic players are always called the same
+    blacklist = {f"Player {rank:07d}": 30 for rank in range(1, 11)}
+    config = customise_config(weights={}, slots={}, blacklist=blacklist)
+
+    results = []
+    for players in sizes:
+        path = os.path.join(data_dir, f"synthetic_{players}.csv")
+        synthetic_projections(players, template).to_csv(path, index=False)
+
+        timings, value_data = asset_stages(path, config, memory=memory)
+        if interface:
+            team = value_data.sort_values("VALUE", ascending=False).head(
+                base_fantasy_config.team_size
+            )
+            timings.update(interface_stages(path, team, memory=memory))
+
+        for stage, timing in timings.items():
+            results.append({"stage": stage, "players": players, **timing})
+            print(
+                f"{stage:>24} {players:>8} {timing['seconds']:>9.3f}s",
+                file=sys.stderr,
+            )
+
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+        },
+        "results": results,
+        "failures": check_thresholds(results, thresholds or {}),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="time and memory profile every pipeline stage"
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--thresholds", default=THRESHOLDS)
+    parser.add_argument("--data-dir", default=None)
+    parser.add_argument("--no-memory", action="store_true")
+    parser.add_argument("--no-interface", action="store_true")
+    args = parser.parse_args()
+
+    with open(args.thresholds) as f:
+        thresholds = json.load(f)
+
+    report = run_benchmark(
+        sizes=args.sizes,
+        data_dir=args.data_dir,
+        thresholds=thresholds,
+        memory=not args.no_memory,
+        interface=not args.no_interface,
+    )
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for failure in report["failures"]:
+        print(
+            f"{failure['stage']} at {failure['players']} players: "
+            f"{failure['metric']} {failure[failure['metric']]:.3f} "
+            f"over {failure['limit']}",
+            file=sys.stderr,
+        )
+
+    sys.exit(1 if report["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main()
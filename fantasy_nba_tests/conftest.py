@@ -0,0 +1,54 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from fantasy_nba import cache
+from fantasy_nba.api import value_projections
+from fantasy_nba.configs import (
+    CATEGORY_WEIGHTS,
+    POSITION_SLOTS,
+    base_fantasy_config,
+    customise_config,
+)
+from fantasy_nba.ingestion import load_source
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def cache_dir(tmp_path_factory):
+    # the disk caches write to a temporary directory, not the repo's
+    caches = [
+        cache.normalisation_cache,
+        cache.source_cache,
+        cache.variability_cache,
+    ]
+    cache_dirs = [disk_cache.cache_dir for disk_cache in caches]
+    root = tmp_path_factory.mktemp("cache")
+    for disk_cache in caches:
+        disk_cache.cache_dir = str(
+            root / os.path.basename(disk_cache.cache_dir)
+        )
+    yield root
+    for disk_cache, previous in zip(caches, cache_dirs):
+        disk_cache.cache_dir = previous
+
+
+@pytest.fixture(scope="session")
+def projections():
+    return load_source(str(DATA_DIR / "bob.csv"))
+
+
+@pytest.fixture(scope="session")
+def valuation(projections):
+    # a full refresh with the league defaults, no game log or schedule
+    config = customise_config(
+        weights=CATEGORY_WEIGHTS, slots=POSITION_SLOTS, blacklist={}
+    )
+    return value_projections(
+        config,
+        projections,
+        base_config=base_fantasy_config,
+        cache=cache.normalisation_cache,
+    )
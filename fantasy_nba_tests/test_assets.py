@@ -1 +1,15 @@
+import json
 
+import pytest
+
+from fantasy_nba_tests.benchmark import SIZES, THRESHOLDS, run_benchmark
+
+
+@pytest.mark.benchmark
+def test_benchmark_thresholds():
+    with open(THRESHOLDS) as f:
+        thresholds = json.load(f)
+
+    report = run_benchmark(sizes=SIZES[:1], thresholds=thresholds)
+
+    assert report["failures"] == []
@@ -0,0 +1,46 @@
+import pickle
+
+import pytest
+
+from fantasy_nba.cache import DiskCache
+
+
+class Moved:
+    pass
+
+
+def test_unreadable_entries_are_misses(tmp_path, monkeypatch):
+    cache = DiskCache(str(tmp_path), 1024**2)
+    cache.put("truncated", list(range(100)))
+    cache.put("moved", Moved())
+    path = tmp_path / "truncated.pkl"
+    path.write_bytes(path.read_bytes()[:10])
+    (tmp_path / "garbage.pkl").write_bytes(b"not a pickle")
+
+    # the class was renamed or removed since the entry was written
+    monkeypatch.delattr(f"{__name__}.Moved")
+
+    assert cache.get("truncated") is None
+    assert cache.get("moved") is None
+    assert cache.get("garbage") is None
+    assert cache.get("missing") is None
+
+
+def test_evict_skips_entries_removed_meanwhile(tmp_path):
+    cache = DiskCache(str(tmp_path), 1000)
+    (tmp_path / "gone.pkl").symlink_to(tmp_path / "nowhere.pkl")
+
+    cache.put("a", b"a" * 600)
+    cache.put("b", b"b" * 600)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == b"b" * 600
+
+
+def test_failed_puts_leave_no_temp_files(tmp_path):
+    cache = DiskCache(str(tmp_path), 1024**2)
+
+    with pytest.raises((pickle.PicklingError, AttributeError)):
+        cache.put("lambda", lambda: None)
+
+    assert list(tmp_path.iterdir()) == []
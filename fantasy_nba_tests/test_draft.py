@@ -0,0 +1,158 @@
+import asyncio
+import copy
+import shutil
+
+import pandas as pd
+import pytest
+
+from fantasy_nba import draft_server
+from fantasy_nba.draft_log import DraftLog
+from fantasy_nba.draft_server import DraftServer, DraftState, restore_draft
+
+
+def log_events(state: DraftState, log: DraftLog, events: list):
+    # what the server does for each applied event
+    for event in events:
+        sequence = state.apply(event)
+        log.append([{"sequence": sequence, **event}])
+
+
+def test_restore_skips_players_missing_from_projections(projections, tmp_path):
+    gone, kept = projections["PLAYER"].iloc[:2]
+    log = DraftLog(str(tmp_path), snapshot_interval=100)
+    log_events(
+        DraftState(projections),
+        log,
+        [
+            {"type": "bid", "player": gone, "price": 30, "team": "a"},
+            {"type": "bid", "player": kept, "price": 20, "team": "b"},
+        ],
+    )
+
+    edited = projections[projections["PLAYER"] != gone]
+    state = restore_draft(log, edited.reset_index(drop=True))
+
+    assert state.sequence == 2
+    assert [event["player"] for event in state.skipped] == [gone]
+    assert state.blacklist == {kept: 20}
+    assert state.rosters == {"b": [kept]}
+
+
+def test_failed_settings_leave_the_draft_unchanged(projections, monkeypatch):
+    state = DraftState(projections)
+    weights, valuation = dict(state.weights), state.valuation
+
+    def fail(*args, **kwargs):
+        raise MemoryError
+
+    monkeypatch.setattr(draft_server, "value_projections", fail)
+    with pytest.raises(MemoryError):
+        state.apply({"type": "settings", "weights": {"PTS": 2}})
+
+    assert state.weights == weights
+    assert state.valuation is valuation
+    assert state.sequence == 0
+
+
+class FailingLog(DraftLog):
+    fail = True
+
+    def append(self, events):
+        if self.fail:
+            raise OSError("disk full")
+        super().append(events)
+
+
+def test_processor_survives_a_failed_batch(projections, tmp_path):
+    player = projections["PLAYER"].iloc[0]
+    log = FailingLog(str(tmp_path), snapshot_interval=100)
+    server = DraftServer(DraftState(projections), log=log)
+    before = salaries(server.state)
+
+    async def run():
+        processor = asyncio.create_task(server.process_events())
+        try:
+            with pytest.raises(OSError):
+                await asyncio.wait_for(
+                    server.submit({"type": "bid", "player": player}), 30
+                )
+            # the bid that wasn't logged was rolled back
+            assert server.state.sequence == 0
+            assert server.state.blacklist == {}
+            pd.testing.assert_frame_equal(salaries(server.state), before)
+
+            log.fail = False
+            return await asyncio.wait_for(
+                server.submit({"type": "bid", "player": player}), 30
+            )
+        finally:
+            processor.cancel()
+
+    assert asyncio.run(run()) == 1
+    assert [event["type"] for event in log.events()] == ["bid"]
+    assert server.state.blacklist == {player: 1}
+
+
+def salaries(state: DraftState):
+    return state.valuation.salary_data().reset_index(drop=True)
+
+
+def test_replay_and_until_rebuild_the_draft(projections, tmp_path):
+    a, b, c = projections["PLAYER"].iloc[:3]
+    events = [
+        {"type": "bid", "player": a, "price": 30, "team": "x"},
+        {"type": "bid", "player": b, "price": 12, "team": "y"},
+        {"type": "settings", "weights": {"TO": 0}, "slots": {"C": 2}},
+        {"type": "bid", "player": c, "price": 8, "team": "x"},
+        {"type": "restore", "player": a},
+    ]
+    log = DraftLog(str(tmp_path / "draft"), snapshot_interval=2)
+    server = DraftServer(DraftState(projections), log=log)
+    states = []
+    for event in events:
+        server.apply_events([event])
+        states.append(copy.deepcopy(server.state.snapshot()))
+
+    # from the snapshot at 4 and from the events alone
+    (tmp_path / "events").mkdir()
+    shutil.copy(log.path, tmp_path / "events")
+    restored = restore_draft(log, projections)
+    replayed = restore_draft(DraftLog(str(tmp_path / "events")), projections)
+    for state in [restored, replayed]:
+        assert state.snapshot() == states[-1]
+        pd.testing.assert_frame_equal(salaries(state), salaries(server.state))
+
+    for until in [1, 3]:
+        state = restore_draft(log, projections, until=until)
+        expected = DraftState(projections)
+        for event in events[:until]:
+            expected.apply(event)
+
+        assert state.snapshot() == states[until - 1]
+        pd.testing.assert_frame_equal(salaries(state), salaries(expected))
+
+
+def test_restore_passes_over_unusable_snapshots(
+    projections, tmp_path, monkeypatch
+):
+    a, b = projections["PLAYER"].iloc[:2]
+    log = DraftLog(str(tmp_path), snapshot_interval=1)
+    server = DraftServer(DraftState(projections), log=log)
+    server.apply_events([{"type": "bid", "player": a, "price": 30}])
+    server.apply_events([{"type": "bid", "player": b, "price": 12}])
+    expected = server.state.snapshot()
+
+    # a snapshot of a class that no longer exists
+    with open(log._snapshot_path(2), "wb") as file:
+        file.write(b"cfantasy_nba.removed\nDraftState\n.")
+    state = restore_draft(log, projections)
+    assert state.snapshot() == expected
+
+    # a new game log or schedule changes the league config
+    base_config = server.state.base_config.model_copy(
+        update={"team_fg": server.state.base_config.team_fg + 0.01}
+    )
+    monkeypatch.setattr(draft_server, "league_base_config", lambda: base_config)
+    state = restore_draft(log, projections)
+    assert state.base_config is base_config
+    assert state.snapshot() == expected
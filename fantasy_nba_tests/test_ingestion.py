@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fantasy_nba.cache import DiskCache
+from fantasy_nba.ingestion import COUNTING_STATS, load_source
+
+PLAYERS = [f"Player {i}" for i in range(40)]
+
+
+def game_log(games: int, seed: int = 0) -> pd.DataFrame:
+    # one row per player per game, teams and positions change mid season
+    rng = np.random.default_rng(seed)
+    players = rng.choice(PLAYERS, games)
+    log = pd.DataFrame(
+        {
+            "GAME_DATE": pd.Timestamp("2024-10-22")
+            + pd.to_timedelta(np.sort(rng.integers(0, 170, games)), unit="D"),
+            "PLAYER": players,
+            "POS": rng.choice(["PG", "SF", "C"], games),
+            "TEAM": rng.choice(["BOS", "LAL", "NYK"], games),
+            "MIN": rng.uniform(10, 40, games).round(1),
+        }
+    )
+    for stat in COUNTING_STATS:
+        log[stat] = rng.poisson(5, games)
+    # attempts never fall below makes
+    log["FGA"] += log["FGM"]
+    log["FTA"] += log["FTM"]
+    return log
+
+
+@pytest.mark.parametrize("chunksize", [None, 7, 1000])
+def test_game_logs_aggregate_like_a_full_read(tmp_path, chunksize):
+    path = tmp_path / "games.csv"
+    game_log(2_000).to_csv(path, index=False)
+
+    log = pd.read_csv(path)
+    players = log.groupby("PLAYER")
+    expected = players[["POS", "TEAM"]].last()
+    expected["GP"] = players.size()
+    expected["MPG"] = players["MIN"].mean()
+    expected[COUNTING_STATS] = players[COUNTING_STATS].mean()
+    expected["FG%"] = players["FGM"].sum() / players["FGA"].sum()
+    expected["FT%"] = players["FTM"].sum() / players["FTA"].sum()
+
+    season = load_source(str(path), chunksize).set_index("PLAYER")
+
+    pd.testing.assert_frame_equal(
+        season.sort_index(),
+        expected[season.columns].sort_index(),
+        check_dtype=False,
+    )
+
+
+def test_projection_dumps_keep_the_last_row(tmp_path, projections):
+    path = tmp_path / "projections.csv"
+    updated = projections.head(10).assign(PTS=projections["PTS"].head(10) + 1)
+    pd.concat([projections, updated]).to_csv(path, index=False)
+
+    loaded = load_source(str(path), chunksize=50).set_index("PLAYER")
+
+    assert len(loaded) == len(projections)
+    pd.testing.assert_series_equal(
+        loaded.loc[updated["PLAYER"], "PTS"],
+        updated.set_index("PLAYER")["PTS"],
+        check_dtype=False,
+    )
+
+
+def test_cached_sources_follow_the_file(tmp_path, projections):
+    path = tmp_path / "projections.csv"
+    cache = DiskCache(str(tmp_path / "cache"), 1024**3)
+    projections.to_csv(path, index=False)
+
+    first = load_source(str(path), cache=cache)
+    pd.testing.assert_frame_equal(load_source(str(path), cache=cache), first)
+    assert len(list((tmp_path / "cache").iterdir())) == 1
+
+    projections.head(10).to_csv(path, index=False)
+    assert len(load_source(str(path), cache=cache)) == 10
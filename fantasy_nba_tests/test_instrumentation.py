@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+import pytest
+from dagster import AssetExecutionContext, asset, materialize
+
+from fantasy_nba.instrumentation import instrumented, reset_peak_rss
+
+
+@asset
+@instrumented
+def allocating(context: AssetExecutionContext) -> pd.DataFrame:
+    # 128 MiB that is freed again before the step ends
+    block = np.ones(128 * 1024**2 // 8)
+    return pd.DataFrame({"total": [block.sum()]})
+
+
+def test_steps_report_their_own_peak():
+    if not reset_peak_rss():
+        pytest.skip("the peak resident set size can't be reset here")
+
+    result = materialize([allocating])
+    metadata = result.asset_materializations_for_node("allocating")[0].metadata
+
+    assert "traced_peak_mib" not in metadata
+    peak = metadata["peak_rss_mib"].value
+    assert peak - metadata["rss_mib"].value > 100
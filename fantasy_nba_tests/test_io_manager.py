@@ -0,0 +1,18 @@
+import pickle
+
+import pytest
+from dagster import AssetKey, build_output_context
+
+from fantasy_nba.io_manager import ArrowIOManager
+
+
+def test_failed_object_writes_leave_no_temp_files(tmp_path):
+    io_manager = ArrowIOManager(base_dir=str(tmp_path))
+    context = build_output_context(asset_key=AssetKey("base_config"))
+
+    io_manager.handle_output(context, {"fantasy_teams": 12})
+    with pytest.raises((pickle.PicklingError, AttributeError)):
+        io_manager.handle_output(context, lambda: None)
+
+    files = [path.name for path in tmp_path.rglob("*") if path.is_file()]
+    assert len(files) == 1 and not files[0].endswith(".tmp")
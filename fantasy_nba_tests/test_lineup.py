@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from scipy.optimize import linear_sum_assignment
+
+from fantasy_nba.configs import POSITION_SLOTS
+from fantasy_nba.lineup import BENCH, assign_rosters, slot_columns
+
+BENCH_SIZE = 3
+
+
+def lineup_value(positional_value, assignment) -> tuple[int, float]:
+    # starters filled, then their summed value
+    values = positional_value.set_index(["PLAYER", "POS"])["VALUE"]
+    starters = [
+        values[player, slot]
+        for player, slot in assignment.items()
+        if slot != BENCH
+    ]
+    return len(starters), sum(starters)
+
+
+def single_roster(positional_value, roster) -> dict[str, str]:
+    # the same starters-first objective, one roster at a time
+    columns = slot_columns(POSITION_SLOTS, BENCH_SIZE)
+    values = positional_value.set_index(["PLAYER", "POS"])["VALUE"]
+    score = np.full((len(roster), len(columns)), -1e9)
+    for i, player in enumerate(roster):
+        for j, column in enumerate(columns):
+            if column == BENCH:
+                score[i, j] = 0
+            elif (player, column) in values.index:
+                score[i, j] = 1e6 + values[player, column]
+
+    rows, cols = linear_sum_assignment(score, maximize=True)
+    return {
+        roster[row]: columns[col]
+        for row, col in zip(rows, cols)
+        if score[row, col] > -1e9
+    }
+
+
+def test_rosters_match_one_assignment_per_roster(valuation):
+    positional_value = valuation.positional_value_data.drop_duplicates(
+        subset=["PLAYER", "POS"]
+    )
+    players = positional_value["PLAYER"].drop_duplicates().to_list()
+    rosters = [players[i:60:4] for i in range(4)] + [[], players[60:62]]
+
+    assignments = assign_rosters(
+        positional_value, rosters, POSITION_SLOTS, BENCH_SIZE
+    )
+
+    for roster, assignment in zip(rosters, assignments):
+        expected = single_roster(positional_value, roster)
+        # the bench is a tie between whoever is left over
+        assert len(assignment) == len(expected)
+        starters, value = lineup_value(positional_value, expected)
+        assert lineup_value(positional_value, assignment) == (
+            starters,
+            pytest.approx(value),
+        )
+        for slot, count in POSITION_SLOTS.items():
+            assert list(assignment.values()).count(slot) <= count
@@ -0,0 +1,66 @@
+import numpy as np
+
+from fantasy_nba.configs import (
+    CATEGORY_WEIGHTS,
+    POSITION_SLOTS,
+    base_fantasy_config,
+    customise_config,
+)
+from fantasy_nba.matchups import (
+    category_directions,
+    evaluate_matchups,
+    weekly_impact,
+)
+
+CATEGORIES = list(CATEGORY_WEIGHTS.keys())
+
+
+def test_normal_matchups_match_monte_carlo(projections):
+    players = projections["PLAYER"].to_list()
+    rosters = [players[i:104:8] for i in range(8)]
+
+    normal = evaluate_matchups(projections, rosters)
+    sampled = evaluate_matchups(
+        projections, rosters, method="monte_carlo", samples=20_000
+    )
+
+    assert len(normal) == 28
+    columns = CATEGORIES + ["WIN", "TIE", "LOSS"]
+    np.testing.assert_allclose(
+        normal[columns].to_numpy(), sampled[columns].to_numpy(), atol=0.02
+    )
+    np.testing.assert_allclose(normal[["WIN", "TIE", "LOSS"]].sum(axis=1), 1)
+
+
+def test_weeks_follow_the_schedule(projections):
+    columns = ["PLAYER", "TEAM", "FGM", "FGA", "FTM", "FTA"] + [
+        category for category in CATEGORIES if "%" not in category
+    ]
+    team = projections["TEAM"].iloc[0]
+    config = base_fantasy_config.model_copy(
+        update={"team_schedule_week": {team: 4.5}}
+    )
+
+    default, _, _ = weekly_impact(projections[columns], base_fantasy_config)
+    scheduled, _, _ = weekly_impact(projections[columns], config)
+
+    on_team = (projections["TEAM"] == team).to_numpy()
+    np.testing.assert_allclose(
+        scheduled["PTS"][on_team],
+        default["PTS"][on_team] * 4.5 / base_fantasy_config.mean_schedule_week,
+    )
+    np.testing.assert_allclose(
+        scheduled["PTS"][~on_team], default["PTS"][~on_team]
+    )
+
+
+def test_punted_categories_are_still_contested():
+    config = customise_config(
+        weights={**CATEGORY_WEIGHTS, "FT%": 0, "PTS": 2},
+        slots=POSITION_SLOTS,
+        blacklist={},
+    )
+    np.testing.assert_array_equal(
+        category_directions(config), category_directions(base_fantasy_config)
+    )
+    assert category_directions(config)[CATEGORIES.index("FT%")] == 1
@@ -0,0 +1,52 @@
+import numpy as np
+
+from fantasy_nba.configs import base_fantasy_config
+from fantasy_nba.punts import player_punts, punt_combinations
+from fantasy_nba.valuation import punt_order
+
+
+def test_punts_compose_like_the_punt_peak(valuation):
+    value_data = valuation.value_data
+    punts = player_punts(value_data, base_fantasy_config)
+    scored = len(punt_combinations(base_fantasy_config).categories)
+    value = value_data["VALUE"].to_numpy()
+
+    def category(name):
+        return np.nan_to_num(value_data[name].to_numpy())
+
+    # punting the k-th category, counting from 0, scales by
+    # (scored - k) / scored
+    two = (value - category("FG%") - category("FT%")) * (scored - 1) / scored
+    np.testing.assert_allclose(punts["FG%+FT%"], two, rtol=1e-5, atol=1e-5)
+
+    three = (
+        (value - category("PTS") - category("FG%") - category("FT%"))
+        * (scored - 1)
+        * (scored - 2)
+        / scored**2
+    )
+    np.testing.assert_allclose(
+        punts["PTS+FG%+FT%"], three, rtol=1e-5, atol=1e-5
+    )
+
+
+def test_punt_peak_is_the_best_build_of_its_punt_order(valuation):
+    # salary_data's peak is worth the same as the combination it punts
+    categories = punt_combinations(base_fantasy_config).categories
+    value_data = valuation.bl_value_data
+    punts = player_punts(value_data, base_fantasy_config)
+
+    punt_value = valuation.punt_value.set_index("PLAYER")
+    order = punt_order(
+        punt_value.loc[value_data["PLAYER"], categories].to_numpy(dtype=float)
+    )
+    first_punt = punts.to_numpy()[
+        np.arange(len(punts)),
+        punts.columns.get_indexer(np.array(categories)[order[:, 0]]),
+    ].astype(float)
+    expected = np.maximum(punts["NONE"], first_punt)
+
+    peak = valuation.salary_data.set_index("PLAYER")["VALUE"]
+    np.testing.assert_allclose(
+        peak[value_data["PLAYER"]], expected, rtol=1e-5, atol=1e-5
+    )
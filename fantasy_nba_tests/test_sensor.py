@@ -0,0 +1,40 @@
+import json
+import shutil
+
+import pytest
+from dagster import DagsterInstance, build_sensor_context
+
+from fantasy_nba.sensor import projection_sources, write_config
+from fantasy_nba.settings import settings
+from fantasy_nba_tests.conftest import DATA_DIR
+from fantasy_nba_tests.test_ingestion import game_log
+
+
+def test_only_readable_projections_are_sources(tmp_path, monkeypatch):
+    shutil.copy(DATA_DIR / "bob.csv", tmp_path)
+    game_log(100).to_csv(tmp_path / "games.csv", index=False)
+    game_log(100).to_csv(tmp_path / "log.csv", index=False)
+    (tmp_path / "schedule.csv").write_text("GAME_DATE,TEAM\n2024-10-22,BOS\n")
+    (tmp_path / "notes.txt").write_text("PLAYER,PTS\nsomeone,10\n")
+    (tmp_path / "empty.csv").write_text("")
+    (tmp_path / "archive").mkdir()
+
+    monkeypatch.setattr(settings, "data_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "game_log", "log.csv")
+    monkeypatch.setattr(settings, "schedule", "schedule.csv")
+
+    with DagsterInstance.ephemeral() as instance:
+        context = build_sensor_context(instance=instance)
+        assert projection_sources(context) == {"bob.csv", "games.csv"}
+
+
+def test_a_failed_config_write_leaves_the_last_config(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "config_dir", str(tmp_path))
+    write_config("league", {"source": "bob.csv"})
+
+    with pytest.raises(TypeError):
+        write_config("league", {"source": object()})
+
+    assert [path.name for path in tmp_path.iterdir()] == ["league.json"]
+    config = json.loads((tmp_path / "league.json").read_text())
+    assert config == {"source": "bob.csv"}
@@ -0,0 +1,28 @@
+import pandas as pd
+
+from fantasy_nba.configs import base_fantasy_config
+from fantasy_nba.simulation import simulate_drafts
+
+
+def test_results_depend_only_on_the_seed(valuation):
+    kwargs = dict(drafts=40, seed=3, batch_size=10)
+    single = simulate_drafts(valuation.salary_data, workers=1, **kwargs)
+    pooled = simulate_drafts(valuation.salary_data, workers=4, **kwargs)
+
+    pd.testing.assert_frame_equal(single.rosters, pooled.rosters)
+    assert single.drafts_per_second > 0
+    assert pooled.drafts_per_second > 0
+
+    other = simulate_drafts(valuation.salary_data, workers=1, drafts=40)
+    assert not other.rosters.equals(single.rosters)
+
+
+def test_rosters_respect_the_budget_and_roster_size(valuation):
+    rosters = simulate_drafts(
+        valuation.salary_data, drafts=200, seed=1, workers=1
+    ).rosters
+
+    assert len(rosters) == 200
+    assert (rosters["SPENT"] <= base_fantasy_config.salary_cap).all()
+    # a dollar is kept back for every open spot, so every roster fills
+    assert (rosters["PLAYERS"] == base_fantasy_config.team_size).all()
@@ -0,0 +1,270 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import PowerTransformer
+
+from fantasy_nba.api import value_projections
+from fantasy_nba.configs import (
+    CATEGORY_WEIGHTS,
+    POSITION_SLOTS,
+    base_fantasy_config,
+    customise_config,
+)
+from fantasy_nba.incremental import IncrementalValuation
+from fantasy_nba.reweight import LinearValuation
+from fantasy_nba.scenarios import evaluate_scenarios
+from fantasy_nba.transformations import (
+    calculate_percentage_value,
+    calculate_z_scores,
+)
+from fantasy_nba.valuation import (
+    normalise_projections,
+    player_values,
+    position_masks,
+    positional_values,
+)
+
+CATEGORIES = list(CATEGORY_WEIGHTS.keys())
+
+
+def full_run(projections, valuation, **inputs):
+    config = customise_config(
+        **{
+            "weights": CATEGORY_WEIGHTS,
+            "slots": POSITION_SLOTS,
+            "blacklist": {},
+            **inputs,
+        }
+    )
+    return config, value_projections(
+        config,
+        projections,
+        base_config=base_fantasy_config,
+        normalised_data=valuation.normalised_data,
+        normalisation_lambdas=valuation.normalisation_lambdas,
+    )
+
+
+def by_player(data: pd.DataFrame, columns: list) -> pd.DataFrame:
+    return data.set_index("PLAYER")[columns].sort_index()
+
+
+def groupby_values(projections, config, blacklist) -> pd.DataFrame:
+    # the groupby/apply pipeline the assets ran before the matrix engine,
+    # bl_value_data for config with the league defaults as the base
+    base_config = base_fantasy_config
+    positions = list(base_config.position_settings.keys())
+    data = projections.copy()
+    for category, made in [("FG%", "FGA"), ("FT%", "FTA")]:
+        data[category] = calculate_percentage_value(
+            attempts=data[made],
+            percent=data[category],
+            team_percent=getattr(config, f"team_{category[:2].lower()}"),
+        )
+    data = data[config.metadata_columns + CATEGORIES]
+    data["POS"] = (
+        data["POS"]
+        .str.split("/")
+        .apply(
+            lambda pos_list: sorted(
+                {
+                    eligible
+                    for pos in pos_list
+                    for eligible in base_config.position_settings[
+                        pos
+                    ].eligible_positions
+                }
+            )
+        )
+    )
+    exploded = data.explode("POS").reset_index(drop=True)
+
+    pt = PowerTransformer(method="yeo-johnson", standardize=True)
+    for pos in positions:
+        rows = exploded["POS"] == pos
+        for category in CATEGORIES:
+            exploded.loc[rows, category] = pt.fit_transform(
+                exploded.loc[rows, [category]] * config.mean_schedule_week
+            ).ravel()
+
+    exploded = exploded[~exploded["PLAYER"].isin(blacklist)]
+    for category in CATEGORIES:
+        exploded[category] = exploded.groupby("POS")[category].transform(
+            calculate_z_scores
+        ) * (base_config.category_settings[category].week_variability)
+        exploded[category] *= config.category_settings[category].weight
+
+    exploded["VALUE"] = exploded[CATEGORIES].sum(axis=1) * exploded["GP"] / 82
+    bench_share = base_config.bench_size / base_config.team_size
+    exploded["SLOTS"] = exploded["POS"].map(
+        lambda pos: config.position_settings[pos].slots * (1 - bench_share)
+        + base_config.position_settings[pos].slots * bench_share
+    )
+    exploded["TOTAL_SLOTS"] = exploded["POS"].map(
+        lambda pos: base_config.position_settings[pos].slots
+    )
+
+    def aggregate(group):
+        total_slots = group["TOTAL_SLOTS"].sum()
+        return pd.Series(
+            {
+                column: (group[column] * group["SLOTS"]).sum() / total_slots
+                for column in CATEGORIES + ["VALUE"]
+            }
+        )
+
+    return exploded.groupby("PLAYER")[
+        CATEGORIES + ["VALUE", "SLOTS", "TOTAL_SLOTS"]
+    ].apply(aggregate)
+
+
+def test_matrix_engine_matches_the_groupby_pipeline(projections):
+    bought = {projections["PLAYER"].iloc[i]: 10 for i in [0, 4, 9]}
+    config = customise_config(
+        weights={**CATEGORY_WEIGHTS, "PTS": 1.5, "FG%": 0.5},
+        slots={**POSITION_SLOTS, "UTIL": 2},
+        blacklist=bought,
+        team_fg=0.47,
+    )
+
+    normalised_data, lambdas = normalise_projections(projections, config)
+    positional_data, bl_positional_data = positional_values(
+        normalised_data, lambdas, base_fantasy_config, list(bought)
+    )
+    _, bl_value_data = player_values(
+        positional_data,
+        bl_positional_data,
+        projections[["PLAYER", "POS"]],
+        config,
+        base_fantasy_config,
+    )
+
+    columns = CATEGORIES + ["VALUE"]
+    pd.testing.assert_frame_equal(
+        by_player(bl_value_data, columns),
+        groupby_values(projections, config, bought)[columns],
+        check_dtype=False,
+        check_names=False,
+        atol=1e-6,
+    )
+
+
+def test_players_without_a_known_position(projections):
+    missing = projections.copy()
+    missing.loc[missing.index[:3], "POS"] = np.nan
+    normalised_data, _ = normalise_projections(missing, base_fantasy_config)
+    assert len(normalised_data) == len(projections) - 3
+    assert not normalised_data["PLAYER"].isin(missing["PLAYER"][:3]).any()
+
+    with pytest.raises(ValueError):
+        position_masks(missing["POS"], base_fantasy_config)
+
+    unknown = projections.copy()
+    unknown.loc[unknown.index[0], "POS"] = "PG/QB"
+    with pytest.raises(ValueError, match="QB"):
+        normalise_projections(unknown, base_fantasy_config)
+
+
+def test_incremental_matches_a_full_recompute(projections, valuation):
+    bought = dict(
+        zip(projections["PLAYER"].iloc[[0, 3, 7, 20]], [40, 5, 12, 1])
+    )
+    config, expected = full_run(projections, valuation, blacklist=bought)
+
+    incremental = IncrementalValuation(
+        valuation.normalised_data,
+        valuation.normalisation_lambdas,
+        projections,
+        valuation.punt_value,
+        customise_config(
+            weights=CATEGORY_WEIGHTS, slots=POSITION_SLOTS, blacklist={}
+        ),
+    )
+    # a bid that is undone again must leave no trace
+    incremental.remove(projections["PLAYER"].iloc[1], 30)
+    incremental.restore(projections["PLAYER"].iloc[1])
+    for player, price in bought.items():
+        incremental.remove(player, price)
+
+    columns = CATEGORIES + ["VALUE"]
+    pd.testing.assert_frame_equal(
+        by_player(incremental.value_data(), columns),
+        by_player(expected.bl_value_data, columns),
+        check_dtype=False,
+    )
+    pd.testing.assert_frame_equal(
+        by_player(incremental.salary_data(), columns + ["SALARY"]),
+        by_player(expected.salary_data, columns + ["SALARY"]),
+        check_dtype=False,
+    )
+
+
+def test_scenarios_match_separate_runs(projections, valuation):
+    bought = {projections["PLAYER"].iloc[2]: 25}
+    scenarios = [
+        {"blacklist": bought},
+        {"blacklist": bought, "weights": {**CATEGORY_WEIGHTS, "TO": 0}},
+        {"blacklist": bought, "slots": {**POSITION_SLOTS, "C": 2}},
+        {"blacklist": {}, "weights": {**CATEGORY_WEIGHTS, "PTS": 2}},
+    ]
+    runs = [full_run(projections, valuation, **inputs) for inputs in scenarios]
+
+    scenario_data = evaluate_scenarios(
+        [config for config, _ in runs],
+        valuation.normalised_data,
+        valuation.normalisation_lambdas,
+    )
+
+    for scenario, (_, expected) in enumerate(runs):
+        pd.testing.assert_frame_equal(
+            by_player(
+                scenario_data[scenario_data["SCENARIO"] == scenario],
+                ["VALUE", "SALARY"],
+            ),
+            by_player(expected.salary_data, ["VALUE", "SALARY"]),
+            check_dtype=False,
+            atol=1e-6,
+        )
+
+
+def test_linear_valuation_matches_a_full_run(projections, valuation):
+    bought = {projections["PLAYER"].iloc[5]: 18}
+    config, start = full_run(projections, valuation, blacklist=bought)
+    linear = LinearValuation(start.contribution_data, start.punt_value, config)
+
+    for weights in [
+        {**CATEGORY_WEIGHTS, "PTS": 1.5, "REB": 0.5},
+        {**CATEGORY_WEIGHTS, "FT%": 0, "AST": 0},
+    ]:
+        _, expected = full_run(
+            projections, valuation, weights=weights, blacklist=bought
+        )
+        reweighted = linear.reweight(start, weights)
+        columns = CATEGORIES + ["VALUE"]
+
+        for field in ["bl_value_data", "contribution_data"]:
+            pd.testing.assert_frame_equal(
+                by_player(getattr(reweighted, field), columns),
+                by_player(getattr(expected, field), columns),
+                check_dtype=False,
+            )
+        pd.testing.assert_frame_equal(
+            by_player(reweighted.salary_data, columns + ["SALARY"]),
+            by_player(expected.salary_data, columns + ["SALARY"]),
+            check_dtype=False,
+        )
+        assert np.array_equal(
+            reweighted.salary_data["PLAYER"], expected.salary_data["PLAYER"]
+        )
+
+        # the outputs valued with the league defaults carry over
+        for field in [
+            "positional_value_data",
+            "bl_positional_value_data",
+            "value_data",
+            "punt_data",
+            "punt_value",
+        ]:
+            pd.testing.assert_frame_equal(
+                getattr(reweighted, field), getattr(expected, field)
+            )
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fantasy_nba.configs import CATEGORY_WEIGHTS
+from fantasy_nba.variability import (
+    PERCENTAGE_STATS,
+    WeekVariance,
+    estimate_week_variability,
+    week_numbers,
+)
+from fantasy_nba_tests.test_ingestion import game_log
+
+CATEGORIES = list(CATEGORY_WEIGHTS.keys())
+
+
+def weekly_totals(log: pd.DataFrame) -> pd.DataFrame:
+    # every player's totals per week, percentage categories as makes above
+    # the league rate on the attempts
+    log = log.assign(WEEK=week_numbers(log["GAME_DATE"]), GAMES=1)
+    weeks = log.groupby(["PLAYER", "WEEK"]).sum(numeric_only=True)
+    for category, (made, attempts) in PERCENTAGE_STATS.items():
+        rate = log[made].sum() / log[attempts].sum()
+        weeks[category] = weeks[made] - rate * weeks[attempts]
+    return weeks[CATEGORIES]
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_streamed_variance_matches_a_direct_variance(ordered):
+    log = game_log(3_000, seed=1)
+    if not ordered:
+        log = log.sample(frac=1, random_state=0)
+
+    week_variance = WeekVariance(ordered)
+    for _, games in log.groupby(np.arange(len(log)) // 250):
+        week_variance.add_games(games)
+    week_variance.finish()
+
+    players = weekly_totals(log).groupby(level="PLAYER")
+    pd.testing.assert_frame_equal(
+        week_variance.player_variability(CATEGORIES)[CATEGORIES].sort_index(),
+        players.std()[CATEGORIES].sort_index(),
+        check_dtype=False,
+        check_names=False,
+    )
+
+
+def test_week_variability_from_the_pooled_variances(tmp_path):
+    path = tmp_path / "games.csv"
+    log = game_log(3_000, seed=2)
+    log.to_csv(path, index=False)
+
+    variability = estimate_week_variability(str(path), CATEGORIES, chunksize=99)
+
+    weeks = weekly_totals(log)
+    players = weeks.groupby(level="PLAYER")
+    within = (players.var() * (players.size() - 1).to_numpy()[:, None]).sum()
+    within /= (players.size() - 1).sum()
+    between = players.mean().var()
+
+    np.testing.assert_allclose(
+        variability.loc[CATEGORIES, "WEEK_VARIABILITY"],
+        np.sqrt(between / (between + within))[CATEGORIES],
+    )
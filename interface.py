@@ -1,16 +1,22 @@
-import time
 import streamlit as st
-import json
-import pickle
 import pandas as pd
 import numpy as np
 
+from fantasy_nba.api import league_base_config, value_projections
+from fantasy_nba.cache import TableCache, normalisation_cache
+from fantasy_nba.ingestion import load_source
+from fantasy_nba.lineup import assign_rosters, open_slots
+from fantasy_nba.punts import roster_punts
+from fantasy_nba.reweight import LinearValuation
 from fantasy_nba.configs import (
     CATEGORY_WEIGHTS,
     POSITION_SLOTS,
     POSITION_ELIGIBILITY_MAP,
     base_fantasy_config,
+    customise_config,
 )
+from fantasy_nba.sensor import write_config
+from fantasy_nba.settings import settings
 
 CATEGORIES = list(CATEGORY_WEIGHTS.keys())
 POSITIONS = list(POSITION_ELIGIBILITY_MAP.keys())
@@ -57,32 +63,86 @@ def refresh_data():
                 np.sign(copy[category]) * abs(copy[category]) * weight
             )
 
-        with open(
-            "/home/bob/.dagster/storage/load_data/bob.csv", "rb"
-        ) as filep:
-            data = pickle.load(filep)
-            team_data = data[
-                data["PLAYER"].isin(st.session_state.team["PLAYER"].tolist())
-            ]
+        data = load_projections()
+        team_data = data[
+            data["PLAYER"].isin(st.session_state.team["PLAYER"].tolist())
+        ]
 
-            team_ft = team_data["FTM"].sum() / team_data["FTA"].sum()
-            team_fg = team_data["FGM"].sum() / team_data["FGA"].sum()
-
-    with open("custom_config.json", "w") as file:
-        json.dump(
-            json.dumps(
-                {
-                    "weights": copy,
-                    "slots": pcopy,
-                    "blacklist": st.session_state.blacklist,
-                    "team_ft": team_ft,
-                    "team_fg": team_fg,
-                }
-            ),
-            file,
+        team_ft = team_data["FTM"].sum() / team_data["FTA"].sum()
+        team_fg = team_data["FGM"].sum() / team_data["FGA"].sum()
+
+    # the game log and schedule estimates, as the base_config asset applies
+    league_config = league_base_config()
+    config = customise_config(
+        weights=copy,
+        slots=pcopy,
+        blacklist=st.session_state.blacklist,
+        team_ft=team_ft,
+        team_fg=team_fg,
+        base_config=league_config,
+    )
+    team_inputs = (
+        (team_ft, team_fg),
+        league_config.mean_schedule_week,
+        league_config.team_schedule_week,
+    )
+    inputs = (dict(pcopy), dict(st.session_state.blacklist), team_inputs)
+
+    if st.session_state.get("valuation") is not None and (
+        st.session_state.get("valuation_inputs") == inputs
+    ):
+        # only the weights changed, reweight the contributions
+        valuation = st.session_state.valuation
+        linear = LinearValuation(
+            valuation.contribution_data, valuation.punt_value, config
         )
+        st.session_state.valuation = linear.reweight(valuation, copy)
+    else:
+        # normalisation only depends on the team percentages and the
+        # schedule, reuse it
+        normalised_data, normalisation_lambdas = None, None
+        if st.session_state.get("valuation") is not None and (
+            st.session_state.team_inputs == team_inputs
+        ):
+            normalised_data = st.session_state.valuation.normalised_data
+            normalisation_lambdas = (
+                st.session_state.valuation.normalisation_lambdas
+            )
+
+        st.session_state.valuation = value_projections(
+            config,
+            load_projections(),
+            base_config=league_config,
+            normalised_data=normalised_data,
+            normalisation_lambdas=normalisation_lambdas,
+            cache=normalisation_cache,
+        )
+    st.session_state.team_inputs = team_inputs
+    st.session_state.valuation_inputs = inputs
+
+    # keep the dagster materialisations in step with the interface
+    write_config(
+        settings.league,
+        {
+            "source": settings.source,
+            "weights": copy,
+            "slots": pcopy,
+            "blacklist": st.session_state.blacklist,
+            "team_ft": team_ft,
+            "team_fg": team_fg,
+        },
+    )
+
 
-    st.session_state.start_time = time.time()
+@st.cache_resource
+def table_cache():
+    return TableCache()
+
+
+def load_projections():
+    return table_cache().load(
+        f"{settings.data_dir}/{settings.source}", load_source
+    )
 
 
 def display_data(df, height=None):
@@ -153,68 +213,22 @@ def display_team():
 
 
 def optimise_slots(team):
-    position_slots = POSITION_SLOTS.copy()
-    drafted_positions = []
-
-    with open(
-        "/home/bob/.dagster/storage/positional_value_data/bob.csv", "rb"
-    ) as filep:
-        positional_value = pickle.load(filep)
-
-    player_positions = positional_value[
-        positional_value["PLAYER"].isin(team["PLAYER"].tolist())
-    ]
-
-    player_positions["DELTA"] = player_positions[
-        "VALUE"
-    ] - player_positions.groupby("PLAYER")["VALUE"].transform("mean")
-
-    player_positions.sort_values(by="DELTA", ascending=False, inplace=True)
-
-    bench = base_fantasy_config.bench_size
-    print(player_positions)
-
-    for index, row in player_positions.iterrows():
-        player = row["PLAYER"]
-        position = row["POS"]
+    assignment = assign_rosters(
+        st.session_state.valuation.positional_value_data,
+        [team["PLAYER"].tolist()],
+        POSITION_SLOTS,
+        base_fantasy_config.bench_size,
+    )[0]
 
-        print(player, position)
-
-        if position_slots[position] == 0 or player in drafted_positions:
-            print("skip")
-            continue
-
-        position_slots[position] -= 1
-        drafted_positions.append(player)
-
-    for player in team["PLAYER"].tolist():
-        if player not in drafted_positions:
-            if bench == 0:
-                eligible = positional_value[
-                    positional_value["PLAYER"] == player
-                ]
-                for index, row in eligible.iterrows():
-                    position = row["POS"]
-                    print(player, position)
-                    print("backup")
-                    if position_slots[position] > 0:
-                        position_slots[position] -= 1
-                        drafted_positions.append(player)
-            else:
-                bench -= 1
-                print(player, position)
-                print("bench")
-
-    return position_slots
+    return open_slots(assignment, POSITION_SLOTS)
 
 
 def get_punt(team):
     if team.empty:
         return "NULL", 0
 
-    with open("/home/bob/.dagster/storage/punt_value/bob.csv", "rb") as file:
-        value = pickle.load(file)
-        team_value = value[value["PLAYER"].isin(team["PLAYER"].tolist())]
+    value = st.session_state.valuation.punt_value
+    team_value = value[value["PLAYER"].isin(team["PLAYER"].tolist())]
 
     for cat in CATEGORIES:
         if st.session_state.weights[cat] == 0:
@@ -237,34 +251,46 @@ def get_punt(team):
     return punt_name, punt_value
 
 
+def get_punt_build(team):
+    # the best punt of up to three categories against punting nothing
+    if team.empty:
+        return "NULL", 0
+
+    builds = roster_punts(
+        st.session_state.valuation.value_data,
+        [team["PLAYER"].tolist()],
+        customise_config(
+            weights=st.session_state.weights, slots={}, blacklist={}
+        ),
+    )
+    no_punt = builds.loc[builds["PUNT"] == "NONE", "VALUE"].iloc[0]
+
+    return builds["PUNT"].iloc[0], round(builds["VALUE"].iloc[0] - no_punt, 2)
+
+
 def app():
     st.set_page_config(layout="wide")
-    if "start_time" not in st.session_state:
-        st.session_state.start_time = None
-
     if "weights" not in st.session_state:
         st.session_state.weights = CATEGORY_WEIGHTS.copy()
 
     if "slots" not in st.session_state:
         st.session_state.slots = POSITION_SLOTS.copy()
 
-    if "stale" not in st.session_state:
-        st.session_state.stale = True
-
     if "team" not in st.session_state:
         st.session_state.team = pd.DataFrame({"PLAYER": []})
 
     if "blacklist" not in st.session_state:
         st.session_state.blacklist = {}
 
-    with open("/home/bob/.dagster/storage/salary_data/bob.csv", "rb") as file:
-        projections = pickle.load(file)
-        projections = projections[
-            ~projections["PLAYER"].isin(list(st.session_state.blacklist.keys()))
-        ]
+    if "valuation" not in st.session_state:
+        refresh_data()
+
+    projections = st.session_state.valuation.salary_data.copy()
+    projections = projections[
+        ~projections["PLAYER"].isin(list(st.session_state.blacklist.keys()))
+    ]
 
-    with open("/home/bob/.dagster/storage/value_data/bob.csv", "rb") as file:
-        value_data = pickle.load(file)
+    value_data = st.session_state.valuation.value_data
 
     player_search = value_data["PLAYER"].tolist()
 
@@ -281,7 +307,6 @@ def app():
         list(st.session_state.blacklist.keys())
     )
 
-    col2.write("loading..." if st.session_state.stale else "")
     if col2.button("Refresh"):
         save_state(selected_players, value_data)
 
@@ -295,20 +320,9 @@ def app():
 
             filter_edited()
 
-        if not st.session_state.stale:
-            st.session_state.stale = True
-            refresh_data()
-
+        refresh_data()
         st.rerun()
 
-    if st.session_state.stale:
-        if not st.session_state.start_time:
-            refresh_data()
-
-        if time.time() - st.session_state.start_time >= 23:
-            st.session_state.stale = False
-            st.rerun()
-
     with st.sidebar:
         col1, col2 = st.columns(2)
 
@@ -327,6 +341,9 @@ def app():
         punt_name, punt_value = get_punt(st.session_state.team)
         col2.metric(label="Punt", value=punt_name, delta=punt_value)
 
+        build_name, build_value = get_punt_build(st.session_state.team)
+        col2.metric(label="Build", value=build_name, delta=build_value)
+
     salary_modifier = display_team()
     projections["SALARY"] = projections["SALARY"] * salary_modifier
     st.session_state.edited = display_data(projections)
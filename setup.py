@@ -4,8 +4,10 @@ setup(
     name="fantasy_nba",
     packages=find_packages(exclude=["fantasy_nba_tests"]),
     install_requires=[
-        "dagster",
-        "dagster-cloud"
+        # fantasy_nba.launcher builds on dagster internals
+        "dagster==1.13.26",
+        "dagster-cloud",
+        "pyarrow",
     ],
     extras_require={"dev": ["dagster-webserver", "pytest"]},
 )